@@ -0,0 +1,133 @@
+"""
+Batch date resolution: which modules are active on which dates.
+
+_resolve_range answers one (module, date) pair at a time. For a school year of
+dates against every module that is 365 x N parse-and-compare calls. Here each
+module's month/day bounds are parsed once into integer keys (month * 32 + day),
+and a whole array of dates is matched against every module at once:
+
+  - with numpy: one broadcast comparison of date keys against start/end keys
+  - without:    query keys sorted once; each module's window is two bisects
+
+Windows that wrap the new year (start after end, e.g. 11/3-1/16) contain a date
+when it is on/after the start or on/before the end, which is exactly what
+_resolve_range decides. Bounds on 2/29 only exist in leap years, so those few
+modules are checked per date with the resolver itself.
+
+USE_NUMPY=0 forces the pure-Python path even when numpy is installed.
+"""
+import bisect
+import os
+from datetime import date
+
+USE_NUMPY = os.environ.get('USE_NUMPY', 'auto').strip().lower() not in ('0', 'false', 'no')
+
+_NUMPY_MISSING = object()
+_numpy_mod = None
+
+
+def _numpy():
+    global _numpy_mod
+    if not USE_NUMPY:
+        return None
+    if _numpy_mod is None:
+        try:
+            import numpy  # type: ignore
+            _numpy_mod = numpy
+        except Exception:  # noqa: BLE001
+            _numpy_mod = _NUMPY_MISSING
+    return None if _numpy_mod is _NUMPY_MISSING else _numpy_mod
+
+
+def day_key(d: date) -> int:
+    return d.month * 32 + d.day
+
+
+class ModuleCalendar:
+    """
+    bounds: (start_md, end_md) per module; module ids are positions in this list.
+    md_to_date / resolve_range: the resolver's own helpers, so parsing and the
+    2/29 fallback agree with it exactly.
+    """
+
+    def __init__(self, bounds: list[tuple[str, str]], md_to_date, resolve_range):
+        self.bounds = bounds
+        self._resolve_range = resolve_range
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        # Ids matched by key comparison, and ids with a 2/29 bound checked per date
+        self.fast: list[int] = []
+        self.slow: list[int] = []
+        for i, (start_md, end_md) in enumerate(bounds):
+            try:
+                # 2000 is a leap year, so 2/29 parses here; it is routed to the slow path below
+                s = md_to_date(start_md, 2000)
+                e = md_to_date(end_md, 2000)
+            except Exception:
+                # _resolve_range would raise for every date: never active
+                self.starts.append(-1)
+                self.ends.append(-1)
+                continue
+            self.starts.append(day_key(s))
+            self.ends.append(day_key(e))
+            if (s.month, s.day) == (2, 29) or (e.month, e.day) == (2, 29):
+                self.slow.append(i)
+            else:
+                self.fast.append(i)
+        self._arrays = None
+
+    def window(self, module_id: int, ref: date) -> tuple[date, date]:
+        """The concrete window of a module around ref, as _resolve_range returns it."""
+        start_md, end_md = self.bounds[module_id]
+        return self._resolve_range(start_md, end_md, ref)
+
+    def _active_slow(self, module_id: int, ref: date) -> bool:
+        try:
+            s, e = self.window(module_id, ref)
+        except Exception:
+            return False
+        return s <= ref <= e
+
+    def active(self, dates: list[date]) -> list[list[int]]:
+        """For each date, the ids of modules active on it, ascending."""
+        if not dates:
+            return []
+        np = _numpy()
+        out = self._active_numpy(np, dates) if np is not None else self._active_bisect(dates)
+        if self.slow:
+            for i, ref in enumerate(dates):
+                extra = [m for m in self.slow if self._active_slow(m, ref)]
+                if extra:
+                    out[i] = sorted(out[i] + extra)
+        return out
+
+    def _active_bisect(self, dates: list[date]) -> list[list[int]]:
+        order = sorted(range(len(dates)), key=lambda i: day_key(dates[i]))
+        keys = [day_key(dates[i]) for i in order]
+        out: list[list[int]] = [[] for _ in dates]
+        for m in self.fast:
+            ks, ke = self.starts[m], self.ends[m]
+            if ke >= ks:
+                spans = ((bisect.bisect_left(keys, ks), bisect.bisect_right(keys, ke)),)
+            else:
+                spans = ((bisect.bisect_left(keys, ks), len(keys)), (0, bisect.bisect_right(keys, ke)))
+            for lo, hi in spans:
+                for j in range(lo, hi):
+                    out[order[j]].append(m)
+        return out
+
+    def _active_numpy(self, np, dates: list[date]) -> list[list[int]]:
+        if self._arrays is None:
+            fast = np.array(self.fast, dtype=np.int64)
+            starts = np.array(self.starts, dtype=np.int64)[fast] if len(fast) else np.zeros(0, dtype=np.int64)
+            ends = np.array(self.ends, dtype=np.int64)[fast] if len(fast) else np.zeros(0, dtype=np.int64)
+            self._arrays = (fast, starts, ends, ends < starts)
+        fast, starts, ends, wraps = self._arrays
+        keys = np.array([day_key(d) for d in dates], dtype=np.int64)[:, None]
+        after_start = keys >= starts
+        before_end = keys <= ends
+        hits = np.where(wraps, after_start | before_end, after_start & before_end)
+        rows, cols = np.nonzero(hits)
+        ids = fast[cols]
+        splits = np.searchsorted(rows, np.arange(1, len(dates)))
+        return [chunk.tolist() for chunk in np.split(ids, splits)]
@@ -0,0 +1,142 @@
+"""
+Response compression with encoded bodies cached per snapshot version.
+
+Responses for the same (snapshot version, route, params) are byte-identical, so
+the JSON body and each compressed variant are produced once and reused until
+the snapshot changes. The cache is a small LRU, so /meta and the hottest
+searches stay resident while one-off queries age out.
+
+brotli is used when the optional `brotli` package is installed and the client
+accepts it; gzip otherwise.
+"""
+import gzip
+import os
+import threading
+from collections import OrderedDict
+
+# Bodies smaller than this are sent as-is; compression would not pay for its headers
+MIN_COMPRESS_BYTES = int(os.environ.get('MIN_COMPRESS_BYTES', '1024') or 0)
+RESPONSE_CACHE_ENTRIES = int(os.environ.get('RESPONSE_CACHE_ENTRIES', '256') or 0)
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+_BROTLI_MISSING = object()
+_brotli_mod = None
+
+
+def _brotli():
+    global _brotli_mod
+    if _brotli_mod is None:
+        try:
+            import brotli  # type: ignore
+            _brotli_mod = brotli
+        except Exception:  # noqa: BLE001
+            _brotli_mod = _BROTLI_MISSING
+    return None if _brotli_mod is _BROTLI_MISSING else _brotli_mod
+
+
+def choose_encoding(accept_encoding: str) -> str:
+    """Pick 'br', 'gzip' or 'identity' from an Accept-Encoding header, honoring q=0."""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    wildcard = accepted.get('*', 0.0)
+    if _brotli() is not None and accepted.get('br', wildcard) > 0:
+        return 'br'
+    if accepted.get('gzip', wildcard) > 0:
+        return 'gzip'
+    return 'identity'
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return _brotli().compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+class BodyCache:
+    """Thread-safe LRU of encoded response bodies."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._data.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body: bytes) -> bytes:
+        if self.max_entries <= 0:
+            return body
+        with self._lock:
+            self._data[key] = body
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return body
+
+    def items(self) -> list:
+        """(key, body) pairs, least recently used first (a copy)."""
+        with self._lock:
+            return list(self._data.items())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'bytes': sum(len(b) for b in self._data.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+CACHE = BodyCache(RESPONSE_CACHE_ENTRIES)
+
+
+def encoded_body(key, accept_encoding: str, render) -> tuple[bytes, str]:
+    """
+    Return (body, content_encoding) for a response.
+
+    key identifies the response and must include the snapshot version; pass None
+    for responses that must not be cached (e.g. debug output). render() is only
+    called on a cache miss and returns the uncompressed body bytes.
+    """
+    encoding = choose_encoding(accept_encoding)
+    if key is None:
+        body = render()
+        if encoding == 'identity' or len(body) < MIN_COMPRESS_BYTES:
+            return body, 'identity'
+        return compress(body, encoding), encoding
+
+    body = CACHE.get((key, 'identity'))
+    if body is None:
+        body = CACHE.put((key, 'identity'), render())
+    if encoding == 'identity' or len(body) < MIN_COMPRESS_BYTES:
+        return body, 'identity'
+    packed = CACHE.get((key, encoding))
+    if packed is None:
+        packed = CACHE.put((key, encoding), compress(body, encoding))
+    return packed, encoding
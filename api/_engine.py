@@ -0,0 +1,254 @@
+import hashlib
+import os
+import threading
+import time
+import logging
+from collections import Counter
+
+logger = logging.getLogger("api")
+
+# How long a loaded sheet is served before the next request triggers a refetch.
+# 0 disables caching and refetches on every request.
+SNAPSHOT_TTL_SECONDS = float(os.environ.get('SNAPSHOT_TTL_SECONDS', '120') or 0)
+
+
+# Rows listed individually in a snapshot's change set; the counts are always complete
+CHANGE_SAMPLE_ROWS = 20
+
+
+def row_hash(row) -> bytes:
+    """Content hash of one row (header -> cell), independent of object identity."""
+    h = hashlib.blake2b(digest_size=16)
+    for key, value in row.items():
+        h.update(str(key).encode('utf-8'))
+        h.update(b'\x1e')
+        h.update(str(value).encode('utf-8'))
+        h.update(b'\x1f')
+    return h.digest()
+
+
+def diff_rows(old: list, new: list) -> dict:
+    """Change set between two row-hash lists: counts plus the first changed row indexes."""
+    old_counts = Counter(old)
+    new_counts = Counter(new)
+    added = new_counts - old_counts
+    removed = old_counts - new_counts
+    sample = []
+    remaining = Counter(added)
+    for i, h in enumerate(new):
+        if len(sample) >= CHANGE_SAMPLE_ROWS:
+            break
+        if remaining[h] > 0:
+            remaining[h] -= 1
+            sample.append(i)
+    return {
+        'rows': len(new),
+        'added': sum(added.values()),
+        'removed': sum(removed.values()),
+        'unchanged': len(new) - sum(added.values()),
+        'reordered': not added and not removed and old != new,
+        'changed_row_indexes': sample,
+    }
+
+
+class Snapshot:
+    """
+    Rows from one successful load of a sheet, plus anything derived from them.
+
+    Indexes are built lazily through derived() and live exactly as long as the
+    rows they were built from, so a refresh never pairs new rows with stale indexes.
+
+    Per-row work goes through map_rows(), which reuses the previous snapshot's
+    result for every row whose content hash is unchanged, so a refresh only
+    re-normalizes the rows that were edited, added or moved in from elsewhere.
+
+    A snapshot is published by a single reference swap in DataEngine and its
+    content never changes afterwards, so a reader that holds one sees one
+    consistent load without taking any lock. Only freshness metadata is updated
+    in place: loaded_at, and on a reload with identical row hashes the rows
+    object itself (equal content, so indexes built from the old one stay valid).
+    """
+
+    def __init__(self, name: str, rows: list, version: int, loaded_at: float,
+                 row_hashes: list | None = None, previous: 'Snapshot | None' = None):
+        self.name = name
+        self.rows = rows
+        # Header order of this load, e.g. for debugging column mapping
+        self.headers = tuple(rows[0].keys()) if len(rows) else ()
+        self.version = version
+        self.loaded_at = loaded_at
+        self.row_hashes = row_hashes if row_hashes is not None else [row_hash(r) for r in rows]
+        self.changes = diff_rows(previous.row_hashes if previous else [], self.row_hashes)
+        self.changes['previous_version'] = previous.version if previous else None
+        # Only the previous snapshot's per-row results are kept, never its rows or indexes
+        self._inherited = dict(previous._row_cache) if previous else {}
+        self._row_cache = {}
+        self.row_stats = {}
+        self._derived = {}
+        self._content_hash = None
+        # Reentrant: a derived index may be built from another one of the same snapshot
+        self._lock = threading.RLock()
+
+    @property
+    def content_hash(self) -> str:
+        """Digest of every row's content in order; equal across processes for equal data."""
+        if self._content_hash is None:
+            self._content_hash = hashlib.blake2b(b''.join(self.row_hashes), digest_size=16).hexdigest()
+        return self._content_hash
+
+    def map_rows(self, key: str, fn) -> list:
+        """[fn(row) for row in rows], reusing earlier snapshots' results for unchanged rows."""
+        return self.derived(f'rows:{key}', lambda rows: self._map_rows(key, fn))
+
+    def _map_rows(self, key: str, fn) -> list:
+        previous = self._inherited.pop(key, {})
+        cache = {}
+        out = []
+        reused = 0
+        for row, h in zip(self.rows, self.row_hashes):
+            if h in cache:
+                value = cache[h]
+            elif h in previous:
+                value = cache[h] = previous[h]
+                reused += 1
+            else:
+                value = cache[h] = fn(row)
+            out.append(value)
+        self._row_cache[key] = cache
+        self.row_stats[key] = {'reused': reused, 'built': len(cache) - reused}
+        return out
+
+    def describe(self) -> dict:
+        return {
+            'version': self.version,
+            'rows': len(self.rows),
+            'headers': list(self.headers),
+            'loaded_at': self.loaded_at,
+            'content_hash': self.content_hash,
+            'changes': self.changes,
+            'row_cache': dict(self.row_stats),
+            'derived': sorted(self._derived),
+        }
+
+    def parts(self) -> list[tuple[str, str, object]]:
+        """(kind, key, object) for everything this snapshot holds, in build order, for memory accounting."""
+        with self._lock:
+            # Copied under the lock derived() builds under; built values are never modified
+            derived = sorted(self._derived.items(), key=lambda kv: (not kv[0].startswith('rows:'), kv[0]))
+            row_cache = dict(self._row_cache)
+        out = [('rows', 'rows', self.rows), ('rows', 'row_hashes', self.row_hashes)]
+        for key, value in derived:
+            out.append(('records' if key.startswith('rows:') else 'indexes', key, value))
+        out.append(('caches', 'row_cache', row_cache))
+        return out
+
+    def derived(self, key: str, factory):
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = factory(self.rows)
+            return self._derived[key]
+
+
+class DataEngine:
+    """
+    Owns one Snapshot per named sheet and refreshes it on a TTL.
+
+    A failed refresh keeps serving the previous snapshot; only a cold engine
+    with nothing loaded surfaces the loader's exception to the caller.
+    """
+
+    def __init__(self, loaders: dict, ttl: float = SNAPSHOT_TTL_SECONDS):
+        self.loaders = dict(loaders)
+        self.ttl = ttl
+        self._snapshots = {}
+        self._versions = {}
+        # Bumped whenever any sheet's content changes; never decreases within a process
+        self.generation = 0
+        self._locks = {name: threading.Lock() for name in self.loaders}
+        # Guards the name -> snapshot map itself; per-sheet locks serialize refetches
+        self._publish_lock = threading.Lock()
+
+    def _fresh(self, snap) -> bool:
+        return snap is not None and time.time() - snap.loaded_at < self.ttl
+
+    def snapshot(self, name: str, wait: bool = False) -> Snapshot:
+        snap = self._snapshots.get(name)
+        if self._fresh(snap):
+            return snap
+        lock = self._locks[name]
+        if snap is None or wait:
+            lock.acquire()
+        elif not lock.acquire(blocking=False):
+            # Another thread is refetching: serve the stale snapshot rather than
+            # queue behind a slow upstream
+            return snap
+        try:
+            # Another thread may have refreshed while we waited for the lock
+            snap = self._snapshots.get(name)
+            if self._fresh(snap):
+                return snap
+            try:
+                rows = self.loaders[name]()
+            except Exception as e:  # noqa: BLE001
+                if snap is None:
+                    raise
+                logger.warning("[engine] refresh of %s failed, serving version %s: %s", name, snap.version, e)
+                snap.loaded_at = time.time()
+                return snap
+            if snap is not None and rows is snap.rows:
+                # Loader handed back the data we already hold (e.g. an unchanged
+                # shared snapshot file): keep the snapshot and its indexes
+                snap.loaded_at = time.time()
+                return snap
+            rows = rows or []
+            hashes = [row_hash(r) for r in rows]
+            if snap is not None and hashes == snap.row_hashes:
+                # Same content in the same order: keep the version, indexes and cached
+                # responses, but hold the new rows object so the identity check above
+                # matches on the next poll (and a replaced snapshot file can be unmapped)
+                snap.rows = rows
+                snap.loaded_at = time.time()
+                return snap
+            version = self._versions.get(name, 0) + 1
+            self._versions[name] = version
+            snap = Snapshot(name, rows, version, time.time(), row_hashes=hashes, previous=snap)
+            with self._publish_lock:
+                self._snapshots[name] = snap
+                # Per-sheet locks do not serialize refreshes of different sheets
+                self.generation += 1
+            if snap.changes['previous_version'] is not None:
+                logger.info("[engine] %s v%s: %s", name, version, {
+                    k: snap.changes[k] for k in ('rows', 'added', 'removed', 'reordered')
+                })
+            return snap
+        finally:
+            lock.release()
+
+    def rows(self, name: str) -> list:
+        return self.snapshot(name).rows
+
+    def snapshots(self) -> dict:
+        """Currently published snapshots by name, without loading or refreshing any (a copy)."""
+        with self._publish_lock:
+            return dict(self._snapshots)
+
+    def describe(self) -> dict:
+        """Loaded snapshots with their last change set and per-row cache reuse, for debugging."""
+        return {name: snap.describe() for name, snap in sorted(self.snapshots().items())}
+
+    def reload(self, name: str) -> Snapshot:
+        """Refetch now, regardless of TTL (e.g. on a push notification)."""
+        self.invalidate(name)
+        return self.snapshot(name, wait=True)
+
+    def invalidate(self, name: str | None = None):
+        """Mark snapshots stale; they keep serving as fallback until a refetch succeeds."""
+        names = [name] if name else list(self._snapshots.keys())
+        for n in names:
+            snap = self._snapshots.get(n)
+            if snap is not None:
+                snap.loaded_at = 0.0
@@ -0,0 +1,51 @@
+"""
+Entity tags for API responses.
+
+Tags are derived from snapshot content digests, not from per-process counters,
+so every worker (and every serverless instance) hands out the same tag for the
+same data and a poll answered by any of them can come back 304. Each tag also
+folds in the route and its normalized params, so two different queries never
+share a tag.
+
+Cache-Control is configurable per route with CACHE_CONTROL_<ROUTE> (route
+upper-cased, '-' and '/' as '_', e.g. CACHE_CONTROL_SEARCH or
+CACHE_CONTROL_REPORT_ACTIVE), falling back to CACHE_CONTROL_DEFAULT and then to
+'no-cache' (store, but revalidate every time).
+"""
+import hashlib
+import os
+
+DEFAULT_CACHE_CONTROL = os.environ.get('CACHE_CONTROL_DEFAULT', '').strip() or 'no-cache'
+
+
+def etag_for(*parts: str) -> str:
+    # Weak: gzip, brotli and identity bodies of one response share the tag
+    return 'W/"' + '.'.join(p for p in parts if p) + '"'
+
+
+def route_etag(data_digest: str, route: str, params: tuple) -> str:
+    """Tag for one route/params pair over data with this content digest."""
+    # repr of the str/int/bool/None tuples used as cache keys is stable across processes
+    query = hashlib.blake2b(repr((route, params)).encode('utf-8'), digest_size=8).hexdigest()
+    return etag_for(data_digest, query)
+
+
+def cache_control(route: str) -> str:
+    name = 'CACHE_CONTROL_' + route.upper().replace('-', '_').replace('/', '_')
+    return os.environ.get(name, '').strip() or DEFAULT_CACHE_CONTROL
+
+
+def matches(if_none_match: str, etag: str) -> bool:
+    """True when an If-None-Match header names etag (weak comparison) or is '*'."""
+    if not if_none_match or not etag:
+        return False
+    bare = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
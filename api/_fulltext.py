@@ -0,0 +1,75 @@
+"""
+Keyword search over pacing modules, built once per pacing snapshot.
+
+Each module's title, essential questions and genres are folded to lowercase
+ASCII words, stopwords dropped and simple plurals reduced ("communities" ->
+"community"), and stored in an inverted index. Each posting carries a
+precomputed weight (the weights of the fields containing the term, times idf),
+so a query only adds up a few postings lists and never rescans module text.
+
+Ranking: modules matching more of the query's terms come first, then higher
+weight, so a title hit beats a passing mention in a question.
+"""
+import heapq
+import math
+
+from api._regex import regex
+from api._typeahead import fold
+
+_WORD = r'[a-z0-9]+'
+
+STOPWORDS = frozenset('''
+    a an and are as at be by can do does for from how in is it its of on or our
+    the their this to was we what when where which who why with you your
+'''.split())
+
+FIELD_WEIGHTS = {'title': 3.0, 'genres': 2.0, 'questions': 1.0}
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def terms(text: str) -> list[str]:
+    return [_stem(w) for w in regex(_WORD).findall(fold(text)) if w not in STOPWORDS]
+
+
+class TextIndex:
+    """docs: one dict of field name -> text (or list of texts) per document."""
+
+    def __init__(self, docs: list[dict]):
+        weights: dict[str, dict[int, float]] = {}
+        for doc_id, doc in enumerate(docs):
+            for field, value in doc.items():
+                field_weight = FIELD_WEIGHTS.get(field, 1.0)
+                texts = value if isinstance(value, (list, tuple)) else [value]
+                # Presence per field, not frequency: "Community and Community" is no better a match
+                for term in {t for text in texts for t in terms(text)}:
+                    per_doc = weights.setdefault(term, {})
+                    per_doc[doc_id] = per_doc.get(doc_id, 0.0) + field_weight
+        n = max(len(docs), 1)
+        self.postings: dict[str, list[tuple[int, float]]] = {}
+        for term, per_doc in weights.items():
+            idf = math.log(1 + n / len(per_doc))
+            self.postings[term] = [(doc_id, w * idf) for doc_id, w in per_doc.items()]
+
+    def search(self, query: str, limit: int = 20, allowed=None) -> list[tuple[int, float, list[str]]]:
+        """
+        Top `limit` (doc_id, score, matched_terms) for query, best first.
+        allowed optionally restricts results to a set of doc ids.
+        """
+        query_terms = list(dict.fromkeys(terms(query)))
+        scores: dict[int, float] = {}
+        matched: dict[int, list] = {}
+        for term in query_terms:
+            for doc_id, weight in self.postings.get(term, ()):
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+                matched.setdefault(doc_id, []).append(term)
+        best = heapq.nsmallest(limit, scores, key=lambda d: (-len(matched[d]), -scores[d], d))
+        return [(doc_id, round(scores[doc_id], 4), matched[doc_id]) for doc_id in best]
@@ -0,0 +1,58 @@
+"""
+Grade sets as integer bitmasks.
+
+The canonical grades PK, K, 1-12 own bits 0-13 in that order, so a mask's bits
+read out in display order and "exclusively 9-12" is one AND. A grade cell can
+still produce other tokens (e.g. '05' or '13' from a malformed band); those get
+bits above 13 the first time an index registers them, so masks match exactly
+what the token lists did.
+"""
+import threading
+
+GRADES = ('PK', 'K') + tuple(str(g) for g in range(1, 13))
+
+_BITS = {g: 1 << i for i, g in enumerate(GRADES)}
+_TOKENS = list(GRADES)
+_lock = threading.Lock()
+
+CANONICAL_MASK = (1 << len(GRADES)) - 1
+HS_MASK = sum(_BITS[g] for g in ('9', '10', '11', '12'))
+
+
+def register(token: str) -> int:
+    """Bit for a token produced while indexing, assigning one if it is new."""
+    try:
+        return _BITS[token]
+    except KeyError:
+        with _lock:
+            if token not in _BITS:
+                _BITS[token] = 1 << len(_TOKENS)
+                _TOKENS.append(token)
+            return _BITS[token]
+
+
+def bit(token: str) -> int:
+    """Bit for a query token; 0 when no indexed row has it (so nothing matches)."""
+    return _BITS.get(token, 0)
+
+
+def mask(tokens) -> int:
+    m = 0
+    for token in tokens:
+        m |= register(token)
+    return m
+
+
+def only_high_school(m: int) -> bool:
+    return bool(m) and not (m & ~HS_MASK)
+
+
+def grades(m: int, sort_key=None) -> list[str]:
+    """
+    Tokens in a mask. Canonical-only masks come back in PK, K, 1-12 order;
+    masks with other tokens are sorted with sort_key.
+    """
+    out = [_TOKENS[i] for i in range(m.bit_length()) if m >> i & 1]
+    if m & ~CANONICAL_MASK and sort_key is not None:
+        out.sort(key=sort_key)
+    return out
@@ -0,0 +1,32 @@
+"""
+Deduplication of repeated cell values.
+
+The sheets repeat a small vocabulary across many rows: district labels,
+curriculum names and grade bands in School Directories; curricula, grades,
+genres, book titles and cover URLs in the Pacing Guide. Parsing builds a fresh
+str for every cell, so each repeat costs its own object. cell() routes values
+through sys.intern, so every equal value shares one object:
+
+  - rows and the indexes built from them hold one copy per distinct value
+  - equal interned strings are identical, so dict lookups and == between
+    index keys and (interned) normalized query text resolve on the identity
+    check without comparing characters
+  - unchanged rows keep sharing strings across refreshes
+
+Interned strings are freed once nothing references them, so values dropped by
+a sheet edit do not accumulate. INTERN_CELLS=0 disables this (for comparison in
+benchmarks/bench_intern.py).
+"""
+import os
+import sys
+
+INTERN_CELLS = os.environ.get('INTERN_CELLS', '1').strip().lower() not in ('0', 'false', 'no')
+
+_intern = sys.intern
+
+
+def cell(value):
+    """value, or the shared copy of an equal str; non-str values pass through."""
+    if INTERN_CELLS and type(value) is str:
+        return _intern(value)
+    return value
@@ -0,0 +1,105 @@
+"""
+JSON serialization for API responses.
+
+dumps() returns UTF-8 bytes with sorted keys and compact separators. It uses
+orjson when installed and falls back to the stdlib encoder; JSON_ENCODER=stdlib
+or JSON_ENCODER=orjson forces one.
+
+RawJSON wraps bytes that are already valid JSON (e.g. a module's book array,
+encoded once per snapshot). The stdlib backend splices them into the output
+verbatim instead of re-encoding the underlying objects on every response;
+orjson embeds them with orjson.Fragment where available (3.9+). Older orjson
+re-encodes the original object, which benchmarks/bench_json.py shows is
+cheaper than a splice pass.
+"""
+import json
+import os
+import re
+import secrets
+
+from api._regex import regex
+
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'auto').strip().lower()
+
+# Per-process marker a RawJSON is encoded as before its bytes are spliced in
+_MARK = f'@@rawjson{secrets.token_hex(8)}:'
+_SPLICE = rb'"' + re.escape(_MARK.encode('ascii')) + rb'(\d+)"'
+
+_ORJSON_MISSING = object()
+_orjson_mod = None
+
+
+class RawJSON:
+    """Pre-serialized JSON bytes to embed as-is, optionally with the object they encode."""
+
+    __slots__ = ('data', 'obj')
+
+    def __init__(self, data: bytes, obj=None):
+        self.data = data
+        self.obj = obj
+
+    def __repr__(self):
+        return f'RawJSON({self.data[:40]!r}...)'
+
+
+def _orjson():
+    global _orjson_mod
+    if JSON_ENCODER == 'stdlib':
+        return None
+    if _orjson_mod is None:
+        try:
+            import orjson  # type: ignore
+            _orjson_mod = orjson
+        except Exception:  # noqa: BLE001
+            if JSON_ENCODER == 'orjson':
+                raise
+            _orjson_mod = _ORJSON_MISSING
+    return None if _orjson_mod is _ORJSON_MISSING else _orjson_mod
+
+
+def encoder_name() -> str:
+    return 'orjson' if _orjson() is not None else 'stdlib'
+
+
+def _stdlib_dumps(obj, default=None) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=default).encode('utf-8')
+
+
+def _orjson_dumps(obj, default=None) -> bytes:
+    orjson = _orjson()
+    return orjson.dumps(obj, default=default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+
+
+def dumps(obj) -> bytes:
+    orjson = _orjson()
+    if orjson is not None:
+        fragment = getattr(orjson, 'Fragment', None)
+
+        def native(o):
+            if isinstance(o, RawJSON):
+                if fragment is not None:
+                    return fragment(o.data)
+                if o.obj is not None:
+                    return o.obj
+                return json.loads(o.data)
+            raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+        return _orjson_dumps(obj, native)
+
+    fragments: list[bytes] = []
+
+    def default(o):
+        if isinstance(o, RawJSON):
+            fragments.append(o.data)
+            return f'{_MARK}{len(fragments) - 1}'
+        raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+    body = _stdlib_dumps(obj, default)
+    if not fragments:
+        return body
+    return regex(_SPLICE).sub(lambda m: fragments[int(m.group(1))], body)
+
+
+def raw(obj) -> RawJSON:
+    """Encode obj once and wrap it for later splicing."""
+    return RawJSON(dumps(obj), obj)
@@ -0,0 +1,70 @@
+"""
+Deep memory accounting for loaded data (/api/debug/memory, tools/memory.py).
+
+sys.getsizeof only measures one object. Sizer walks containers, instance
+dicts and __slots__ and sums every object reachable from a structure, counting
+each object once across the whole report: a string shared by the raw rows and
+an index is charged to whichever structure was measured first. Measuring in
+load order (rows, per-row records, indexes, caches) therefore reports what each
+layer adds on top of the ones before it, and the parts sum to the total.
+
+Functions, classes and modules are not followed (they are code, not data).
+"""
+import sys
+import types
+
+_LEAVES = (str, bytes, bytearray, int, float, complex, bool, type(None), range, memoryview)
+_SKIP = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+class Sizer:
+    def __init__(self):
+        self._seen: set[int] = set()
+
+    def size(self, obj) -> int:
+        """Bytes reachable from obj that no earlier size() call already counted."""
+        total = 0
+        stack = [obj]
+        seen = self._seen
+        while stack:
+            o = stack.pop()
+            if id(o) in seen or isinstance(o, _SKIP):
+                continue
+            seen.add(id(o))
+            total += sys.getsizeof(o)
+            if isinstance(o, _LEAVES):
+                continue
+            if isinstance(o, dict):
+                stack.extend(o.keys())
+                stack.extend(o.values())
+            elif isinstance(o, (list, tuple, set, frozenset)):
+                stack.extend(o)
+            else:
+                d = getattr(o, '__dict__', None)
+                if d is not None:
+                    stack.append(d)
+                for slot in getattr(type(o), '__slots__', ()):
+                    if hasattr(o, slot):
+                        stack.append(getattr(o, slot))
+        return total
+
+
+def process_rss() -> dict:
+    """Current and peak resident set size of this process, where the platform reports them."""
+    out = {'rss_bytes': None, 'peak_rss_bytes': None}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    out['rss_bytes'] = int(line.split()[1]) * 1024
+                elif line.startswith('VmHWM:'):
+                    out['peak_rss_bytes'] = int(line.split()[1]) * 1024
+    except OSError:
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Linux reports KiB, macOS bytes
+            out['peak_rss_bytes'] = peak if sys.platform == 'darwin' else peak * 1024
+        except Exception:  # noqa: BLE001
+            pass
+    return out
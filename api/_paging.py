@@ -0,0 +1,71 @@
+"""
+Cursor pagination and field projection helpers.
+
+A cursor is an opaque token holding a resume position plus a short digest of
+the data tag (see api._etag) it was issued under. Positions only mean something
+for the data that produced them, so a cursor from before a sheet change is
+rejected as stale and the client starts over, rather than silently skipping or
+repeating rows. The digest is content-derived, so a cursor issued by one worker
+is valid on every other.
+"""
+import base64
+import hashlib
+
+
+class PageError(ValueError):
+    """A malformed or stale cursor, or an unknown field; reported as a 400."""
+
+
+def _scope_digest(scope: str) -> str:
+    return hashlib.blake2b((scope or '').encode('utf-8'), digest_size=6).hexdigest()
+
+
+def encode_cursor(position: int, scope: str) -> str:
+    raw = f'{position}.{_scope_digest(scope)}'.encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, scope: str) -> int:
+    """Resume position for cursor ('' means the first page)."""
+    cursor = (cursor or '').strip()
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        position, digest = raw.split('.', 1)
+        position = int(position)
+    except Exception:  # noqa: BLE001
+        raise PageError('malformed cursor') from None
+    if position < 0:
+        raise PageError('malformed cursor')
+    if digest != _scope_digest(scope):
+        raise PageError('stale cursor: the data changed since this page was issued; start again without a cursor')
+    return position
+
+
+def parse_limit(raw: str, maximum: int):
+    """None (no paging) when raw is empty, else an int clamped to 1..maximum."""
+    raw = (raw or '').strip()
+    if not raw:
+        return None
+    try:
+        return max(1, min(int(raw), maximum))
+    except ValueError:
+        raise PageError('limit must be an integer') from None
+
+
+def reject_paging(cursor: str, limit, what: str = 'format=ndjson'):
+    """Raise PageError when cursor or limit is given to a response that always streams every row."""
+    if cursor or limit is not None:
+        raise PageError(f'cursor and limit cannot be combined with {what}; page with JSON responses instead')
+
+
+def parse_fields(raw: str, allowed) -> frozenset | None:
+    """None (every field) when raw is empty, else the comma-separated names, all of which must be in allowed."""
+    names = frozenset(f.strip() for f in (raw or '').split(',') if f.strip())
+    if not names:
+        return None
+    unknown = names - frozenset(allowed)
+    if unknown:
+        raise PageError(f'unknown fields: {", ".join(sorted(unknown))}; allowed: {", ".join(allowed)}')
+    return names
@@ -0,0 +1,14 @@
+"""
+Lazily compiled regular expressions.
+
+Patterns compiled at import time are paid by every cold start, including
+/health, so modules compile them through regex() on first use instead.
+"""
+import functools
+import re
+
+
+@functools.lru_cache(maxsize=None)
+def regex(pattern, flags: int = 0):
+    """Compile a pattern on first use and keep it for the life of the process."""
+    return re.compile(pattern, flags)
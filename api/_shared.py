@@ -1,4 +1,5 @@
 import csv
+import functools
 import io
 import json
 import os
@@ -8,31 +9,42 @@ import logging
 from datetime import date
 from urllib.parse import urlencode
 
-import requests
+from api._engine import DataEngine
+from api import _grades, _intern, _json, _upstream
+from api._regex import regex as _regex
 
-try:  # Optional dependency for robust CSV + UTF-8 handling
-    import pandas as pd  # type: ignore
-except Exception:  # noqa: BLE001
-    pd = None
+# Import-time work here is paid by every cold start, including /health, so
+# `requests` is imported on the first real fetch and pandas only when opted in.
+USE_PANDAS = os.environ.get('USE_PANDAS', '').strip().lower() in ('1', 'true', 'yes')
 
 logger = logging.getLogger("api")
 logger.setLevel(logging.INFO)
 
-# Track last-seen header order for logging/index mapping
-LAST_PACING_HEADERS_ORDER = []
-LAST_SCHOOLS_HEADERS_ORDER = []
-
 # Configuration for Google Sheet source
 SHEET_ID = os.environ.get('SHEET_ID', '12xrUodG0RyTpAlfo6_CO7phNY2LdzjH9mqieJQIV3Xs').strip()
 GID_FOR_PACING = os.environ.get('GID_FOR_PACING', os.environ.get('SHEET_GID_PACING', '')).strip()
 GID_FOR_SCHOOLS = os.environ.get('GID_FOR_SCHOOLS', os.environ.get('SHEET_GID_SCHOOLS', '')).strip()
 
-DEFAULT_PACING_PUBHTML = 'https://docs.google.com/spreadsheets/d/e/2PACX-1vSE0Mlty0JFy27H58nEULY3GNCsvwyCfIw4CQvf2_KbXsGXa4GIhU_SQojf5eXdz1MkKO7se9lJyjZT/pubhtml?gid=0&single=true'
-DEFAULT_SCHOOLS_PUBHTML = 'https://docs.google.com/spreadsheets/d/e/2PACX-1vT4AF0prElSWZtki_k9Xv1KPA01lARZf5-ctTFz9vi2qnTpLe2ji_M7aXi2v_Uo-u2_NuizVhINlaua/pubhtml?gid=1673123403&single=true'
+# Scheme + host the sheet URLs point at; load tests point this at a local stand-in (tools/loadtest.py)
+SHEETS_ORIGIN = (os.environ.get('SHEETS_ORIGIN', '').strip() or 'https://docs.google.com').rstrip('/')
+
+DEFAULT_PACING_PUBHTML = f'{SHEETS_ORIGIN}/spreadsheets/d/e/2PACX-1vSE0Mlty0JFy27H58nEULY3GNCsvwyCfIw4CQvf2_KbXsGXa4GIhU_SQojf5eXdz1MkKO7se9lJyjZT/pubhtml?gid=0&single=true'
+DEFAULT_SCHOOLS_PUBHTML = f'{SHEETS_ORIGIN}/spreadsheets/d/e/2PACX-1vT4AF0prElSWZtki_k9Xv1KPA01lARZf5-ctTFz9vi2qnTpLe2ji_M7aXi2v_Uo-u2_NuizVhINlaua/pubhtml?gid=1673123403&single=true'
+
+
+def _pandas():
+    """Optional dependency for robust CSV + UTF-8 handling; None unless USE_PANDAS is set."""
+    if not USE_PANDAS:
+        return None
+    try:
+        import pandas as pd  # type: ignore
+    except Exception:  # noqa: BLE001
+        return None
+    return pd
 
 
 def json_response(data: dict, status: int = 200, extra_headers: dict | None = None):
-    body = json.dumps(data, ensure_ascii=False)
+    body = _json.dumps(data)
     headers = {
         "Content-Type": "application/json; charset=utf-8",
         "Access-Control-Allow-Origin": "*",
@@ -50,7 +62,7 @@ def _pubhtml_to_csv(url: str) -> str:
     if not u:
         return ''
     u = u.replace('/pubhtml', '/pub')
-    m = re.search(r'[?&]gid=([^&#]+)', u)
+    m = _regex(r'[?&]gid=([^&#]+)').search(u)
     gid = m.group(1) if m else ''
     base = u.split('?')[0]
     if gid:
@@ -60,17 +72,18 @@ def _pubhtml_to_csv(url: str) -> str:
 
 PACING_CSV = os.environ.get(
     'PACING_CSV',
-    'https://docs.google.com/spreadsheets/d/12xrUodG0RyTpAlfo6_CO7phNY2LdzjH9mqieJQIV3Xs/export?format=csv&gid=1707233296'
+    f'{SHEETS_ORIGIN}/spreadsheets/d/12xrUodG0RyTpAlfo6_CO7phNY2LdzjH9mqieJQIV3Xs/export?format=csv&gid=1707233296'
 ).strip()
 SCHOOLS_CSV = os.environ.get('SCHOOLS_CSV', _pubhtml_to_csv(DEFAULT_SCHOOLS_PUBHTML)).strip()
 
-SHEET_BASE_PUB = os.environ.get('SHEET_BASE_PUB', f'https://docs.google.com/spreadsheets/d/{SHEET_ID}/pub').strip()
+SHEET_BASE_PUB = os.environ.get('SHEET_BASE_PUB', f'{SHEETS_ORIGIN}/spreadsheets/d/{SHEET_ID}/pub').strip()
 TAB_PACING = os.environ.get('TAB_PACING', 'Pacing Guide')
 TAB_SCHOOLS = os.environ.get('TAB_SCHOOLS', 'School Directories')
 
 
+@functools.lru_cache(maxsize=4096)
 def _normalize_header(h):
-    return re.sub(r"[\s/]+", "_", (h or "").strip().lower())
+    return _regex(r"[\s/]+").sub("_", (h or "").strip().lower())
 
 
 def _normalize_lookup_text(value: str) -> str:
@@ -82,8 +95,9 @@ def _normalize_lookup_text(value: str) -> str:
     - collapse internal whitespace
     """
     s = normalize_text(str(value or "")).lower()
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    s = _regex(r"\s+").sub(" ", s).strip()
+    # Interned: index keys and normalized query text compare by identity (api/_intern.py)
+    return _intern.cell(s)
 
 
 def _normalize_curriculum_text(value: str) -> str:
@@ -94,9 +108,9 @@ def _normalize_curriculum_text(value: str) -> str:
     - repeated internal whitespace
     """
     s = normalize_text(str(value or "")).lower()
-    s = re.sub(r"\s*&\s*", "&", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    s = _regex(r"\s*&\s*").sub("&", s)
+    s = _regex(r"\s+").sub(" ", s).strip()
+    return _intern.cell(s)
 
 
 def _csv_from_text(text):
@@ -105,11 +119,12 @@ def _csv_from_text(text):
     if not rows:
         return []
     headers = [_normalize_header(h) for h in rows[0]]
+    cell = _intern.cell
     result = []
     for r in rows[1:]:
         obj = {}
         for idx, h in enumerate(headers):
-            obj[h] = (r[idx] if idx < len(r) else '').strip()
+            obj[h] = cell((r[idx] if idx < len(r) else '').strip())
         result.append(obj)
     return result
 
@@ -122,14 +137,14 @@ def split_genres(s: str):
     if not s:
         return []
     unified = str(s).replace('\r\n', '\n').replace('\r', '\n')
-    return [g.strip() for g in unified.split('\n') if g.strip()]
+    return [_intern.cell(g.strip()) for g in unified.split('\n') if g.strip()]
 
 
 def split_questions(s: str):
     s = normalize_text(s)
     if not s:
         return []
-    parts = re.split(r"\?\s*|\n+|;+", s)
+    parts = _regex(r"\?\s*|\n+|;+").split(s)
     items = []
     for p in parts:
         t = (p or '').strip()
@@ -161,12 +176,12 @@ def _extract_title_and_url(cell_text: str):
     s = str(cell_text or '').strip()
     if not s:
         return '', ''
-    m = re.search(r'(?i)HYPERLINK\(\s*"(.*?)"\s*,\s*"(.*?)"\s*\)', s)
+    m = _regex(r'(?i)HYPERLINK\(\s*"(.*?)"\s*,\s*"(.*?)"\s*\)').search(s)
     if m:
         url = m.group(1).strip()
         title = normalize_text(m.group(2))
         return (title or url, url)
-    m = re.search(r"(?i)HYPERLINK\(\s*'(.*?)'\s*,\s*'(.*?)'\s*\)", s)
+    m = _regex(r"(?i)HYPERLINK\(\s*'(.*?)'\s*,\s*'(.*?)'\s*\)").search(s)
     if m:
         url = m.group(1).strip()
         title = normalize_text(m.group(2))
@@ -176,7 +191,7 @@ def _extract_title_and_url(cell_text: str):
         title = normalize_text(left)
         url = right.strip()
         return (title or url, url)
-    um = re.search(r"(https?://\S+)", s)
+    um = _regex(r"(https?://\S+)").search(s)
     if um:
         url = um.group(1).rstrip(').,;')
         title = s[: um.start()].strip().strip(':-').strip() or url
@@ -235,9 +250,9 @@ def _collect_reading_list_items_strict(row: dict):
         if not title_text:
             continue
         items.append({
-            'title': title_text,
-            'url': (url if url else None),
-            'coverImageUrl': (cover if cover else None),
+            'title': _intern.cell(title_text),
+            'url': (_intern.cell(url) if url else None),
+            'coverImageUrl': (_intern.cell(cover) if cover else None),
         })
     return items
 
@@ -261,7 +276,7 @@ def _reading_related_keys(headers):
 def _build_csv_urls(sheet_name, sheet_gid=''):
     urls = []
     if SHEET_ID and sheet_gid:
-        urls.append(f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={sheet_gid}")
+        urls.append(f"{SHEETS_ORIGIN}/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={sheet_gid}")
     base = SHEET_BASE_PUB
     if base:
         if '/gviz/tq' in base:
@@ -281,8 +296,7 @@ def _fetch_sheet(sheet_name, sheet_gid=''):
     last_err = None
     for url in _build_csv_urls(sheet_name, sheet_gid):
         try:
-            resp = requests.get(url, timeout=20)
-            resp.raise_for_status()
+            resp = _upstream.fetch(url)
             text = resp.text.lstrip('\ufeff').strip()
             if not text:
                 last_err = RuntimeError('empty csv')
@@ -302,17 +316,17 @@ def _fetch_csv_from_url(url: str, context: str = ''):
         normalized = _pubhtml_to_csv(url)
     sep = '&' if ('?' in normalized) else '?'
     live_url = f"{normalized}{sep}_cb={int(time.time())}"
-    resp = requests.get(live_url, timeout=20, headers={
+    resp = _upstream.fetch(live_url, headers={
         'Cache-Control': 'no-cache',
         'Pragma': 'no-cache',
     })
-    resp.raise_for_status()
     if context == 'pacing':
         try:
             logger.info("[Pacing] export_url %s", live_url)
             logger.info("[Pacing] status %s", getattr(resp, 'status_code', 'n/a'))
         except Exception:
             pass
+    pd = _pandas()
     if pd is not None:
         decoded = resp.content.decode('utf-8', errors='replace')
         if context == 'pacing':
@@ -327,7 +341,7 @@ def _fetch_csv_from_url(url: str, context: str = ''):
             obj = {}
             for k, v in rec.items():
                 nk = _normalize_header(str(k))
-                obj[nk] = str(v).strip() if v is not None else ''
+                obj[nk] = _intern.cell(str(v).strip()) if v is not None else ''
             rows.append(obj)
         if context == 'pacing':
             try:
@@ -353,66 +367,29 @@ def _fetch_csv_from_url(url: str, context: str = ''):
 
 
 def _fetch_schools_csv():
-    global LAST_SCHOOLS_HEADERS_ORDER
+    # Header order travels with the rows: see Snapshot.headers in api/_engine.py
     if SCHOOLS_CSV:
-        rows = _fetch_csv_from_url(SCHOOLS_CSV)
-        try:
-            if rows:
-                LAST_SCHOOLS_HEADERS_ORDER = list(rows[0].keys())
-        except Exception:
-            pass
-        return rows
+        return _fetch_csv_from_url(SCHOOLS_CSV)
     if SHEET_ID and GID_FOR_SCHOOLS:
-        url = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_FOR_SCHOOLS}"
-        rows = _fetch_csv_from_url(url)
-        try:
-            if rows:
-                LAST_SCHOOLS_HEADERS_ORDER = list(rows[0].keys())
-        except Exception:
-            pass
-        return rows
-    rows = _fetch_sheet(TAB_SCHOOLS, GID_FOR_SCHOOLS)
-    try:
-        if rows:
-            LAST_SCHOOLS_HEADERS_ORDER = list(rows[0].keys())
-    except Exception:
-        pass
-    return rows
+        url = f"{SHEETS_ORIGIN}/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_FOR_SCHOOLS}"
+        return _fetch_csv_from_url(url)
+    return _fetch_sheet(TAB_SCHOOLS, GID_FOR_SCHOOLS)
 
 
 def _fetch_pacing_csv():
-    global LAST_PACING_HEADERS_ORDER
     if PACING_CSV:
-        rows = _fetch_csv_from_url(PACING_CSV, context='pacing')
-        try:
-            if rows:
-                LAST_PACING_HEADERS_ORDER = list(rows[0].keys())
-        except Exception:
-            pass
-        return rows
+        return _fetch_csv_from_url(PACING_CSV, context='pacing')
     if SHEET_ID and GID_FOR_PACING:
-        url = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_FOR_PACING}"
-        rows = _fetch_csv_from_url(url, context='pacing')
-        try:
-            if rows:
-                LAST_PACING_HEADERS_ORDER = list(rows[0].keys())
-        except Exception:
-            pass
-        return rows
-    rows = _fetch_sheet(TAB_PACING, GID_FOR_PACING)
-    try:
-        if rows:
-            LAST_PACING_HEADERS_ORDER = list(rows[0].keys())
-    except Exception:
-        pass
-    return rows
+        url = f"{SHEETS_ORIGIN}/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={GID_FOR_PACING}"
+        return _fetch_csv_from_url(url, context='pacing')
+    return _fetch_sheet(TAB_PACING, GID_FOR_PACING)
 
 
 def _md_to_date(md: str, year: int) -> date:
     md = (md or '').strip()
     if not md:
         raise ValueError('empty month-day')
-    m = re.match(r"^(\d{1,2})[./\-](\d{1,2})$", md)
+    m = _regex(r"^(\d{1,2})[./\-](\d{1,2})$").match(md)
     if not m:
         from datetime import datetime
         dt = datetime.strptime(md, '%b %d')
@@ -432,6 +409,25 @@ def _resolve_range(start_md: str, end_md: str, ref: date):
     return _md_to_date(start_md, ref.year - 1), e
 
 
+def _module_window_overlapping(start_md: str, end_md: str, first: date, last: date):
+    """
+    The concrete (start, end) dates of a month/day module window that overlap
+    [first, last], earliest first, or None. Windows that wrap the new year run
+    into the following year, as in _resolve_range.
+    """
+    for year in range(first.year - 1, last.year + 1):
+        try:
+            s = _md_to_date(start_md, year)
+            e = _md_to_date(end_md, year)
+            if e < s:
+                e = _md_to_date(end_md, year + 1)
+        except ValueError:
+            continue
+        if s <= last and e >= first:
+            return s, e
+    return None
+
+
 def _normalize_school_directories(rows):
     districts = set()
     schools_by_district = {}
@@ -478,7 +474,7 @@ def _normalize_school_directories(rows):
             or r.get('grade_level') or r.get('grade_levels') or ''
         )
         if grade_cell:
-            parts = re.split(r"[^0-9kK]+", grade_cell)
+            parts = _regex(r"[^0-9kK]+").split(grade_cell)
             for p in parts:
                 p = p.strip()
                 if not p:
@@ -561,7 +557,7 @@ def _normalize_grade_tokens(cell: str) -> list[str]:
 
     # First, extract any embedded ranges anywhere in the string, e.g.
     # "High Schools (9-12) & Combined" -> 9,10,11,12
-    for m in re.finditer(r'(PK|PRE-K|PREK|P K|K|OK|\d{1,2})\s*-\s*(PK|PRE-K|PREK|P K|K|OK|\d{1,2})', txt, flags=re.I):
+    for m in _regex(r'(PK|PRE-K|PREK|P K|K|OK|\d{1,2})\s*-\s*(PK|PRE-K|PREK|P K|K|OK|\d{1,2})', re.I).finditer(txt):
         sa = to_num(m.group(1))
         sb = to_num(m.group(2))
         if sa >= 0 and sb >= 0:
@@ -573,7 +569,7 @@ def _normalize_grade_tokens(cell: str) -> list[str]:
                 add(from_num(n))
 
     # Then extract standalone tokens, e.g. "PK/K", "9,10,11,12"
-    for tok in re.findall(r'(PK|PRE-K|PREK|P K|K|OK|\d{1,2})', txt, flags=re.I):
+    for tok in _regex(r'(PK|PRE-K|PREK|P K|K|OK|\d{1,2})', re.I).findall(txt):
         add(tok)
     return out
 
@@ -589,7 +585,6 @@ def _is_high_school_row(row: dict) -> bool:
     or if its grade band tokens are exclusively 9-12.
     Uses exact normalized checks only.
     """
-    hs_tokens = {'9', '10', '11', '12'}
     raw_grade = _normalize_lookup_text(row.get('grade') or '')
     if raw_grade in {
         'high school',
@@ -600,20 +595,567 @@ def _is_high_school_row(row: dict) -> bool:
     band_tokens = _normalize_grade_tokens(
         str(row.get('grade_level') or row.get('grade_levels') or row.get('grade') or '')
     )
-    if band_tokens and set(band_tokens).issubset(hs_tokens):
-        return True
-    return False
+    return _grades.only_high_school(_grades.mask(band_tokens))
 
 
-def build_meta(debug: bool = False):
+def _load_rows(name: str) -> list:
     try:
-        schools_rows = _fetch_schools_csv()
+        return ENGINE.rows(name)
     except Exception:
-        schools_rows = []
+        return []
+
+
+def _pacing_row_fields(r: dict) -> dict:
+    """Pull the pacing columns every builder reads out of one raw row."""
+    start_md = (r.get(_normalize_header('start_md')) or r.get('start_md') or r.get('start') or '').strip()
+    end_md = (r.get(_normalize_header('end_md')) or r.get('end_md') or r.get('end') or '').strip()
+    if not (start_md and end_md):
+        dr = (r.get(_normalize_header('Date Range')) or r.get('date_range') or '').strip()
+        s_md, e_md = _split_date_range(dr)
+        start_md = start_md or s_md
+        end_md = end_md or e_md
+    return {
+        'curriculum': (r.get(_normalize_header('Curriculum')) or r.get('curriculum') or '').strip(),
+        'grade': (r.get(_normalize_header('Grade Level')) or r.get('grade') or r.get('grade_level') or '').strip(),
+        'start_md': start_md,
+        'end_md': end_md,
+        'module_number': (r.get(_normalize_header('Module')) or r.get('module') or r.get('module_number') or '').strip(),
+        'module_title': normalize_text((r.get(_normalize_header('Theme')) or r.get('module_title') or r.get('theme') or '').strip()),
+        'essential_question': normalize_text((r.get(_normalize_header('Essential Questions')) or r.get('essential_question') or '').strip()),
+        'text_genres': normalize_text((r.get(_normalize_header('Text Genres')) or r.get('text_genres') or '').strip()),
+        'raw_questions': r.get(_normalize_header('Essential Questions')) or '',
+    }
+
+
+def _module_sort_number(module_number: str) -> int:
+    try:
+        return int(str(module_number).strip())
+    except Exception:
+        m = _regex(r"(\d+)").search(str(module_number))
+        return int(m.group(1)) if m else 0
+
+
+def _pacing_record(r: dict) -> dict:
+    """
+    Everything the indexes need from one pacing row. Pure per row, so a refresh
+    reuses it for rows whose content did not change (see Snapshot.map_rows).
+    """
+    rec = _pacing_row_fields(r)
+    rec['curriculum_norm'] = _normalize_curriculum_text(rec['curriculum'])
+    rec['row_grades'] = _normalize_grade_tokens(str(rec['grade']))
+    rec['grade_mask'] = _grades.mask(rec['row_grades'])
+    rec['searchable'] = bool(
+        rec['curriculum'] and rec['grade'] and rec['start_md'] and rec['end_md'] and rec['module_number']
+    )
+    if rec['module_number']:
+        rec['module'] = {
+            'module_number': _module_sort_number(rec['module_number']),
+            'module_title': rec['module_title'],
+            'start_md': rec['start_md'],
+            'end_md': rec['end_md'],
+        }
+    if rec['searchable']:
+        books_items = _collect_reading_list_items_strict(r)
+        rec['questions'] = split_questions(rec['essential_question'] or rec['raw_questions'])
+        rec['genres'] = split_genres(rec['text_genres'])
+        rec['books'] = books_items
+        rec['books_json'] = json.dumps(books_items, ensure_ascii=False)
+        # Encoded once; HTTP responses splice these bytes in as-is
+        rec['books_raw'] = _json.raw(books_items)
+        rec['books_json_raw'] = _json.raw(rec['books_json'])
+    return rec
+
+
+def _index_pacing(rows: list, records: list | None = None) -> dict:
+    """
+    Compile pacing rows once per snapshot:
+      - records: every row's extracted fields, in sheet order (debug samples read these)
+      - by_curriculum: searchable records keyed by normalized curriculum
+      - modules: /modules payloads keyed by (normalized curriculum, grade text)
+    records, when given, are the rows already passed through _pacing_record.
+    """
+    if records is None:
+        records = [_pacing_record(r) for r in rows]
+    searchable = []
+    by_curriculum: dict[str, list] = {}
+    modules: dict[tuple, list] = {}
+    for rec in records:
+        if rec['module_number']:
+            modules.setdefault((rec['curriculum_norm'], normalize_text(rec['grade'])), []).append(rec['module'])
+        if not rec['searchable']:
+            continue
+        searchable.append(rec)
+        by_curriculum.setdefault(rec['curriculum_norm'], []).append(rec)
+    for key, mods in modules.items():
+        modules[key] = sorted(mods, key=lambda m: int(m.get('module_number') or 0))
+    return {
+        'records': records,
+        'searchable': searchable,
+        'by_curriculum': by_curriculum,
+        'modules': modules,
+    }
+
+
+def _school_row_grade_cell(row: dict) -> str:
+    return str(
+        row.get('grade') or row.get('grades') or row.get('grades_served')
+        or row.get('grade_level') or row.get('grade_levels') or row.get('column_e') or ''
+    )
+
+
+def _school_entry(r: dict) -> dict:
+    """What /search and the school indexes derive from one School Directories row."""
+    district = _school_row_district(r)
+    return {
+        'name_norm': _normalize_lookup_text(_school_row_name(r)),
+        'district': district,
+        'district_norm': _normalize_lookup_text(district),
+        'school': _school_row_name(r),
+        'curriculum': _school_row_curriculum(r),
+        'grade_mask': _grades.mask(_normalize_grade_tokens(_school_row_grade_cell(r))),
+        'high_school': _is_high_school_row(r),
+        'dbn': (r.get('dbn') or r.get('school_dbn') or '').strip(),
+    }
+
+
+def _index_schools(rows: list, entries: list | None = None) -> dict:
+    """School entries (see _school_entry) keyed by normalized school name, in sheet order."""
+    if entries is None:
+        entries = [_school_entry(r) for r in rows]
+    by_name: dict[str, list] = {}
+    for entry in entries:
+        by_name.setdefault(entry['name_norm'], []).append(entry)
+    return {'by_name': by_name}
+
+
+def _grade_sort_key(g: str):
+    return (g != 'PK', g != 'K', int(g) if str(g).isdigit() else -1)
+
+
+def _school_profiles(rows: list, entries: list | None = None) -> dict:
+    """
+    Every school resolved the way /search resolves it, keyed by (normalized name,
+    normalized district), and by (normalized name, None) for lookups without a
+    district: the first matching row's district, name and curriculum, grades
+    unioned across every matching row, high school if any row is, and the first
+    DBN. /search, /calendar and the per-school views (see _school_profile_list)
+    all read this one table.
+    """
+    if entries is None:
+        entries = [_school_entry(r) for r in rows]
+    out: dict[tuple, dict] = {}
+
+    def add(key: tuple, entry: dict):
+        profile = out.get(key)
+        if profile is None:
+            profile = out[key] = {
+                'district': entry['district'],
+                'school': entry['school'],
+                'curriculum': entry['curriculum'],
+                'curriculum_norm': _normalize_curriculum_text(entry['curriculum']),
+                'grade_mask': 0,
+                'high_school': False,
+            }
+        profile['grade_mask'] |= entry['grade_mask']
+        profile['high_school'] = profile['high_school'] or entry['high_school']
+        if entry['dbn'] and not profile.get('dbn'):
+            profile['dbn'] = entry['dbn']
+
+    for entry in entries:
+        add((entry['name_norm'], entry['district_norm']), entry)
+        add((entry['name_norm'], None), entry)
+    for profile in out.values():
+        profile['grades'] = _grades.grades(profile['grade_mask'], _grade_sort_key)
+    return out
+
+
+def _school_profile_list(profiles: dict) -> list:
+    """
+    The per-school view of _school_profiles: one profile per school in a
+    district, sorted by district then name (typeahead, books, the report).
+    """
+    out = [
+        profile for (_, district_norm), profile in profiles.items()
+        if district_norm is not None and profile['district'] and profile['school']
+    ]
+    out.sort(key=lambda p: (p['district'], p['school']))
+    return out
+
+
+def _index_typeahead(profiles: list):
+    from api._typeahead import TypeaheadIndex
+    return TypeaheadIndex(profiles)
+
+
+def _index_schools_by_curriculum_grade(profiles: list) -> dict:
+    """
+    Schools that /search would serve pacing rows to, as shared {district, school}
+    refs sorted by district then name, keyed by (normalized curriculum, grade
+    token). High schools are left out, as /search short-circuits them.
+    """
+    out: dict[tuple, list] = {}
+    for profile in profiles:
+        if profile['high_school'] or not profile['curriculum']:
+            continue
+        ref = {'district': profile['district'], 'school': profile['school']}
+        for grade in profile['grades']:
+            out.setdefault((profile['curriculum_norm'], grade), []).append(ref)
+    return out
+
+
+def _index_pacing_groups(pacing: dict) -> dict:
+    """
+    Searchable pacing records as /search walks them, keyed by normalized
+    curriculum (None for every curriculum): {'all': records, 'by_grade': {grade
+    bit: records}}, each list in sheet order. A grade query reads its list
+    directly instead of testing every record's grade mask.
+    """
+    def group(records: list) -> dict:
+        by_grade: dict[int, list] = {}
+        for rec in records:
+            m = rec['grade_mask']
+            while m:
+                low = m & -m
+                by_grade.setdefault(low, []).append(rec)
+                m ^= low
+        return {'all': records, 'by_grade': by_grade}
+
+    out = {curriculum_norm: group(records) for curriculum_norm, records in pacing['by_curriculum'].items()}
+    out[None] = group(pacing['searchable'])
+    return out
+
+
+_NO_PACING = {'all': [], 'by_grade': {}}
+
+
+def _book_key(title: str) -> str:
+    return _normalize_lookup_text(title)
+
+
+def _book_url_key(url: str) -> str:
+    return str(url or '').strip().rstrip('/').lower()
+
+
+def _index_books(pacing: dict) -> dict:
+    """
+    Reverse index from reading-list books to the pacing records that assign them:
+      by_title / by_url: normalized title or URL -> [(record, book)] in sheet order
+      titles: (accent-folded title, normalized title) pairs, sorted, for partial lookups
+    """
+    from api._typeahead import fold
+    by_title: dict[str, list] = {}
+    by_url: dict[str, list] = {}
+    for rec in pacing['searchable']:
+        for book in rec['books']:
+            by_title.setdefault(_book_key(book['title']), []).append((rec, book))
+            if book.get('url'):
+                by_url.setdefault(_book_url_key(book['url']), []).append((rec, book))
+    titles = sorted((fold(key), key) for key in by_title)
+    return {'by_title': by_title, 'by_url': by_url, 'titles': titles}
+
+
+def _index_text(pacing: dict) -> dict:
+    """
+    Keyword index over searchable pacing records (doc id = position in
+    pacing['searchable']), plus id sets for the curriculum and grade filters.
+    """
+    from api._fulltext import TextIndex
+    records = pacing['searchable']
+    by_curriculum: dict[str, set] = {}
+    by_grade: dict[str, set] = {}
+    for doc_id, rec in enumerate(records):
+        by_curriculum.setdefault(rec['curriculum_norm'], set()).add(doc_id)
+        for grade in rec['row_grades']:
+            by_grade.setdefault(grade, set()).add(doc_id)
+    index = TextIndex([
+        {'title': rec['module_title'], 'questions': rec['questions'], 'genres': rec['genres']}
+        for rec in records
+    ])
+    return {'index': index, 'records': records, 'by_curriculum': by_curriculum, 'by_grade': by_grade}
+
+
+def _index_calendar(pacing: dict):
+    """Batch date matcher over searchable pacing records (module id = position in pacing['searchable'])."""
+    from api._calendar import ModuleCalendar
+    return ModuleCalendar([(rec['start_md'], rec['end_md']) for rec in pacing['searchable']], _md_to_date, _resolve_range)
+
+
+def _pacing_index_of(snap) -> dict:
+    return snap.derived('pacing_index', lambda rows: _index_pacing(rows, snap.map_rows('pacing_record', _pacing_record)))
+
+
+def _school_entries_of(snap) -> list:
+    return snap.map_rows('school_entry', _school_entry)
+
+
+def _school_profiles_of(snap) -> dict:
+    return snap.derived('school_profiles', lambda rows: _school_profiles(rows, _school_entries_of(snap)))
+
+
+def _school_profile_list_of(snap) -> list:
+    return snap.derived('school_profile_list', lambda rows: _school_profile_list(_school_profiles_of(snap)))
+
+
+def _pacing_index() -> dict:
+    try:
+        snap = ENGINE.snapshot('pacing')
+    except Exception:
+        return _index_pacing([])
+    return _pacing_index_of(snap)
+
+
+def _schools_index() -> dict:
+    try:
+        snap = ENGINE.snapshot('schools')
+    except Exception:
+        return _index_schools([])
+    return snap.derived('schools_index', lambda rows: _index_schools(rows, _school_entries_of(snap)))
+
+
+def _books_index() -> dict:
+    try:
+        snap = ENGINE.snapshot('pacing')
+    except Exception:
+        return _index_books(_index_pacing([]))
+    return snap.derived('books_index', lambda rows: _index_books(_pacing_index_of(snap)))
+
+
+def _calendar_index():
+    try:
+        snap = ENGINE.snapshot('pacing')
+    except Exception:
+        return _index_calendar(_index_pacing([]))
+    return snap.derived('calendar', lambda rows: _index_calendar(_pacing_index_of(snap)))
+
+
+def _text_index() -> dict:
+    try:
+        snap = ENGINE.snapshot('pacing')
+    except Exception:
+        return _index_text(_index_pacing([]))
+    return snap.derived('text_index', lambda rows: _index_text(_pacing_index_of(snap)))
+
+
+def _schools_by_curriculum_grade() -> dict:
+    try:
+        snap = ENGINE.snapshot('schools')
+    except Exception:
+        return {}
+    return snap.derived(
+        'schools_by_curriculum_grade',
+        lambda rows: _index_schools_by_curriculum_grade(_school_profile_list_of(snap)),
+    )
+
+
+def _typeahead_index():
+    try:
+        snap = ENGINE.snapshot('schools')
+    except Exception:
+        return _index_typeahead([])
+    return snap.derived('typeahead_index', lambda rows: _index_typeahead(_school_profile_list_of(snap)))
+
+
+def _pacing_groups() -> dict:
+    try:
+        snap = ENGINE.snapshot('pacing')
+    except Exception:
+        return _index_pacing_groups(_index_pacing([]))
+    return snap.derived('pacing_groups', lambda rows: _index_pacing_groups(_pacing_index_of(snap)))
+
+
+def _school_profile_table() -> dict:
+    try:
+        snap = ENGINE.snapshot('schools')
+    except Exception:
+        return _school_profiles([])
+    return _school_profiles_of(snap)
+
+
+def _debug_sample_rows(limit: int = 5) -> list:
+    return [
+        {'grade_level': rec['grade'], 'parsed_grades': rec['row_grades']}
+        for rec in _pacing_index()['records'][:limit]
+    ]
+
+
+# Where rows come from (see api/_sources.py):
+#   DATA_SOURCE=sheets (default)  live Google Sheets
+#   DATA_SOURCE=local             DATA_PATH only, no network (load tests, deterministic startup)
+# DATA_FALLBACK_PATH, when set, serves a local file if the sheets cannot be loaded.
+DATA_SOURCE = os.environ.get('DATA_SOURCE', 'sheets').strip().lower()
+DATA_PATH = os.environ.get(
+    'DATA_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'curricula.json'),
+).strip()
+DATA_FALLBACK_PATH = os.environ.get('DATA_FALLBACK_PATH', '').strip()
+
+
+def _make_source():
+    from api._sources import FallbackSource, LocalFileSource, SheetSource
+
+    if DATA_SOURCE == 'local':
+        return LocalFileSource(DATA_PATH)
+    source = SheetSource({'schools': _fetch_schools_csv, 'pacing': _fetch_pacing_csv})
+    if DATA_FALLBACK_PATH:
+        source = FallbackSource(source, LocalFileSource(DATA_FALLBACK_PATH))
+    return source
+
+
+SOURCE = _make_source()
+
+# Optional host-wide snapshot file (see api/_snapfile.py). When set, one worker
+# per host fetches the sheets and every worker memory-maps the result; the
+# engine then only polls the file header and rebuilds indexes on a version bump.
+SNAPSHOT_FILE = os.environ.get('SNAPSHOT_FILE', '').strip()
+SNAPSHOT_FILE_POLL_SECONDS = float(os.environ.get('SNAPSHOT_FILE_POLL_SECONDS', '5') or 0)
+
+# One engine per process: api/index.py and server.py both read through it, so
+# whichever entry point serves traffic shares the same warm snapshots and indexes.
+if SNAPSHOT_FILE:
+    from api._engine import SNAPSHOT_TTL_SECONDS
+    from api._snapfile import SharedSnapshotStore
+
+    SNAPSHOT_STORE = SharedSnapshotStore(SNAPSHOT_FILE, SOURCE.loaders(), ttl=SNAPSHOT_TTL_SECONDS)
+    ENGINE = DataEngine({
+        'schools': lambda: SNAPSHOT_STORE.rows('schools'),
+        'pacing': lambda: SNAPSHOT_STORE.rows('pacing'),
+    }, ttl=SNAPSHOT_FILE_POLL_SECONDS)
+else:
+    SNAPSHOT_STORE = None
+    ENGINE = DataEngine(SOURCE.loaders())
+
+
+def _snapshot_or_none(name: str):
     try:
-        pacing_rows = _fetch_pacing_csv()
+        return ENGINE.snapshot(name)
     except Exception:
-        pacing_rows = []
+        return None
+
+
+def data_version():
+    """
+    Versions of the snapshots every response is currently built from, or None
+    when a sheet has no data. Response caches key on this.
+    """
+    schools = _snapshot_or_none('schools')
+    pacing = _snapshot_or_none('pacing')
+    if schools is None or pacing is None:
+        return None
+    return (schools.version, pacing.version)
+
+
+def data_tag():
+    """
+    (generation, digest) for the data responses are currently built from, or None
+    when a sheet has no data. generation is this process's monotonic data version;
+    the digest is content-derived so it is identical across workers (ETags and
+    cursors are built from it).
+    """
+    schools = _snapshot_or_none('schools')
+    pacing = _snapshot_or_none('pacing')
+    if schools is None or pacing is None:
+        return None
+    return ENGINE.generation, schools.content_hash[:12] + pacing.content_hash[:12]
+
+
+# Shared secret for POST /api/invalidate; the endpoint is disabled while unset
+INVALIDATE_TOKEN = os.environ.get('INVALIDATE_TOKEN', '').strip()
+
+
+def check_invalidate_token(presented: str) -> bool:
+    import hmac
+    if not INVALIDATE_TOKEN or not presented:
+        return False
+    return hmac.compare_digest(presented.encode('utf-8'), INVALIDATE_TOKEN.encode('utf-8'))
+
+
+def invalidate(names=None) -> dict:
+    """
+    Refetch the given sheets (default: all) now instead of waiting for the TTL.
+    With SNAPSHOT_FILE, the shared file is rewritten first so every worker on the
+    host switches on its next poll; otherwise only this process reloads.
+    """
+    names = [n for n in (names or ENGINE.loaders) if n in ENGINE.loaders]
+    out = {'ok': True, 'snapshots': {}}
+    if SNAPSHOT_STORE is not None:
+        try:
+            SNAPSHOT_STORE.refresh(force=True, block=True)
+        except Exception as e:  # noqa: BLE001
+            out['ok'] = False
+            out['snapshot_file_error'] = str(e)
+    for name in names:
+        try:
+            snap = ENGINE.reload(name)
+            out['snapshots'][name] = {'version': snap.version, 'changes': snap.changes}
+        except Exception as e:  # noqa: BLE001
+            out['ok'] = False
+            out['snapshots'][name] = {'error': str(e)}
+    out['generation'] = ENGINE.generation
+    return out
+
+
+# Single-slot cache of the compiled /meta payload, keyed by the snapshot versions it was built from
+_META_CACHE: tuple = ((None, None), None)
+
+
+def _materialized_meta() -> tuple[dict, dict]:
+    global _META_CACHE
+    schools = _snapshot_or_none('schools')
+    pacing = _snapshot_or_none('pacing')
+    if schools is None or pacing is None:
+        return _compile_meta(schools.rows if schools else [], pacing.rows if pacing else [])
+    key = (schools.version, pacing.version)
+    cached_key, cached = _META_CACHE
+    if cached_key == key and cached is not None:
+        return cached
+    compiled = _compile_meta(schools.rows, pacing.rows)
+    _META_CACHE = (key, compiled)
+    return compiled
+
+
+META_FIELDS = ('districts', 'schools', 'grades', 'curricula', 'districtBySchool')
+META_MAX_LIMIT = 5000
+
+
+def build_meta(debug: bool = False, include_schools: bool = True, fields=None, cursor: str = '', limit=None):
+    """
+    include_schools=False drops the per-school lists ('schools', 'districtBySchool')
+    for clients that look schools up through /typeahead instead.
+    fields: optional set of META_FIELDS to return.
+    cursor/limit: page through 'schools' (districtBySchool then covers only that
+    page's schools); a full page carries 'next_cursor'. Raises api._paging.PageError
+    for a malformed or stale cursor, or for paging a response without 'schools'.
+    """
+    meta, debug_info = _materialized_meta()
+    if fields is not None:
+        meta = {k: v for k, v in meta.items() if k in fields}
+    else:
+        meta = dict(meta)
+    if not include_schools:
+        meta.pop('schools', None)
+        meta.pop('districtBySchool', None)
+    if limit is not None or cursor:
+        from api import _paging
+        if 'schools' not in meta:
+            # Nothing to page: a cursor or next_cursor here would only mislead
+            raise _paging.PageError("cursor and limit page 'schools', which this response does not include")
+        scope = _page_scope()
+        start = _paging.decode_cursor(cursor, scope)
+        schools = _materialized_meta()[0]['schools']
+        end = len(schools) if limit is None else start + limit
+        page = schools[start:end]
+        meta['schools'] = page
+        if 'districtBySchool' in meta:
+            by_school = meta['districtBySchool']
+            meta['districtBySchool'] = {ref['school']: by_school[ref['school']] for ref in page if ref['school'] in by_school}
+        if end < len(schools):
+            meta['next_cursor'] = _paging.encode_cursor(end, scope)
+    if debug:
+        meta['debug'] = debug_info
+    return meta
+
+
+def _compile_meta(schools_rows: list, pacing_rows: list) -> tuple[dict, dict]:
     districts_set = set()
     schools_list = []
     district_by_school = {}
@@ -711,56 +1253,83 @@ def build_meta(debug: bool = False):
     debug_info['row_count'] = len(schools_rows)
     debug_info['district_count'] = len(set([s['district'] for s in schools_list if s.get('district')]))
     debug_info['school_count'] = len(schools_list)
-    if debug:
-        meta['debug'] = debug_info
-    return meta
+    return meta, debug_info
 
 
-def build_modules(curriculum: str, grade: str):
+def stream_modules(curriculum: str, grade: str):
+    """build_modules as (head, rows) for streamed responses."""
     if not curriculum or not grade:
-        return {'modules': []}
-    try:
-        pacing_rows = _fetch_pacing_csv()
-    except Exception:
-        pacing_rows = []
-    modules = []
-    for r in pacing_rows:
-        r_curr = _normalize_curriculum_text((r.get(_normalize_header('Curriculum')) or r.get('curriculum') or '').strip())
-        r_grade = normalize_text((r.get(_normalize_header('Grade Level')) or r.get('grade') or r.get('grade_level') or '').strip())
-        if r_curr != _normalize_curriculum_text(curriculum) or str(r_grade) != str(grade):
-            continue
-        module_number = (r.get(_normalize_header('Module')) or r.get('module') or r.get('module_number') or '').strip()
-        module_title = normalize_text((r.get(_normalize_header('Theme')) or r.get('module_title') or r.get('theme') or '').strip())
-        start_md = (r.get(_normalize_header('start_md')) or r.get('start_md') or r.get('start') or '').strip()
-        end_md = (r.get(_normalize_header('end_md')) or r.get('end_md') or r.get('end') or '').strip()
-        if not (start_md and end_md):
-            dr = (r.get(_normalize_header('Date Range')) or r.get('date_range') or '').strip()
-            s_md, e_md = _split_date_range(dr)
-            start_md = start_md or s_md
-            end_md = end_md or e_md
-        if not module_number:
-            continue
-        try:
-            num = int(str(module_number).strip())
-        except Exception:
-            m = re.search(r"(\d+)", str(module_number))
-            num = int(m.group(1)) if m else 0
-        modules.append({
-            'module_number': num,
-            'module_title': module_title,
-            'start_md': start_md,
-            'end_md': end_md,
-        })
-    modules.sort(key=lambda m: int(m.get('module_number') or 0))
-    return {'modules': modules}
+        return {}, iter(())
+    modules = _pacing_index()['modules'].get((_normalize_curriculum_text(curriculum), str(grade)), [])
+    return {}, iter(modules)
+
+
+def build_modules(curriculum: str, grade: str):
+    head, rows = stream_modules(curriculum, grade)
+    return {'modules': list(rows), **head}
+
+
+# Every field a /search result can carry, in output order (for fields= projection)
+SEARCH_FIELDS = (
+    'district', 'school', 'grade', 'curriculum', 'module_number', 'module_title',
+    'essential_question', 'questions', 'text_genres', 'genres', 'books', 'books_json',
+    'books_source', 'dateRange', 'start_md', 'end_md',
+)
+SEARCH_MAX_LIMIT = 500
+
+
+def build_search(params: dict, fields=None, cursor: str = '', limit=None):
+    """
+    fields: optional set of SEARCH_FIELDS to emit (api._paging.parse_fields).
+    cursor/limit: page through results; a full page carries 'next_cursor'.
+    Raises api._paging.PageError for a malformed or stale cursor.
+    """
+    if limit is None and not cursor:
+        head, rows = stream_search(params, fields)
+        return {'results': list(rows), **head}
+    from api import _paging
+    # Positions index a per-grade pacing group, so cursors are scoped to that layout
+    scope = _page_scope() + ':pacing_groups'
+    head, hits = _search_hits(params, fields, _paging.decode_cursor(cursor, scope))
+    results = []
+    next_position = None
+    for position, item in hits:
+        if limit is not None and len(results) == limit:
+            next_position = position
+            break
+        results.append(item)
+    out = {'results': results, **head}
+    if next_position is not None:
+        out['next_cursor'] = _paging.encode_cursor(next_position, scope)
+    return out
 
 
-def build_search(params: dict):
+def stream_search(params: dict, fields=None):
+    """
+    build_search as (head, rows): head holds every response field except
+    'results', rows yields the result items one at a time, so a streamed
+    response never holds the full list.
+    """
+    head, hits = _search_hits(params, fields)
+    return head, (item for _, item in hits)
+
+
+def _page_scope() -> str:
+    tag = data_tag()
+    return tag[1] if tag else ''
+
+
+def _search_hits(params: dict, fields=None, start: int = 0):
+    """(head, generator of (candidate position, item)); positions are cursor resume points."""
     q_date = (params.get('date') or '').strip()
     q_district = (params.get('district') or '').strip()
     q_school = (params.get('school') or '').strip()
     q_grade = (params.get('grade') or '').strip()
     debug_flag = str(params.get('debug') or '').lower() in ('1', 'true', 'yes')
+    # Internal: carry raw month/day bounds so static pre-rendered results can be date-filtered client-side
+    include_bounds = bool(params.get('include_bounds'))
+    # Internal: emit pre-serialized book arrays (api._json.RawJSON); only for callers encoding with api._json
+    raw_fragments = bool(params.get('raw_fragments'))
     ref = None
     try:
         if q_date:
@@ -768,55 +1337,23 @@ def build_search(params: dict):
             ref = date(y, m, d)
     except Exception:
         ref = None
-    try:
-        schools_rows = _fetch_schools_csv()
-    except Exception:
-        schools_rows = []
     resolved_curriculum = ''
-    # Compute allowed grades and resolve curriculum; allow district to be optional
+    # Resolve the school through the precomputed profile table; district is optional
     eff_district = q_district
     allowed_grades: list[str] = []
-    chosen_row = None
-    matching_rows: list[dict] = []
+    profile = None
     selected_grade_norm = _normalize_selected_grade(q_grade)
-    norm_q_school = _normalize_lookup_text(q_school)
-    norm_q_district = _normalize_lookup_text(q_district)
-    if schools_rows and q_school:
-        # First collect exact normalized matches on school name
-        school_matches = [
-            r for r in schools_rows
-            if _normalize_lookup_text(_school_row_name(r)) == norm_q_school
-        ]
-        # Narrow by district only when provided
-        if q_district:
-            matching_rows = [
-                r for r in school_matches
-                if _normalize_lookup_text(_school_row_district(r)) == norm_q_district
-            ]
-        else:
-            matching_rows = school_matches
-        if matching_rows:
-            chosen_row = matching_rows[0]
-            eff_district = _school_row_district(chosen_row) or eff_district
-            # Union all allowed grades across exact matching rows
-            allowed_set = set()
-            for mr in matching_rows:
-                grade_cell = (
-                    mr.get('grade') or mr.get('grades') or mr.get('grades_served')
-                    or mr.get('grade_level') or mr.get('grade_levels') or mr.get('column_e') or ''
-                )
-                for gt in _normalize_grade_tokens(str(grade_cell)):
-                    allowed_set.add(gt)
-            allowed_grades = sorted(
-                list(allowed_set),
-                key=lambda g: (g != 'PK', g != 'K', int(g) if str(g).isdigit() else -1)
-            )
-            resolved_curriculum = _school_row_curriculum(chosen_row)
+    selected_bit = _grades.bit(selected_grade_norm)
+    if q_school:
+        district_key = _normalize_lookup_text(q_district) if q_district else None
+        profile = _school_profile_table().get((_normalize_lookup_text(q_school), district_key))
+    if profile is not None:
+        eff_district = profile['district'] or eff_district
+        allowed_grades = profile['grades']
+        resolved_curriculum = profile['curriculum']
     # Short-circuit for any high-school grade selection or known high-school school row.
-    hs_tokens = {'9', '10', '11', '12'}
-    if selected_grade_norm in hs_tokens or any(_is_high_school_row(r) for r in matching_rows):
+    if selected_bit & _grades.HS_MASK or (profile is not None and profile['high_school']):
         resp = {
-            'results': [],
             'message': 'NYC Reads is currently focused on grades K–8. Curriculum information and reading lists for grades 9–12 are not yet available in this tool.',
             'message_type': 'high_school_not_available',
             'info_url': 'https://www.schools.nyc.gov/learning/subjects/literacy/nyc-reads',
@@ -825,24 +1362,12 @@ def build_search(params: dict):
         }
         if debug_flag:
             resp['allowed_grades'] = allowed_grades
-            try:
-                pacing_rows = _fetch_pacing_csv()
-            except Exception:
-                pacing_rows = []
-            sample_rows = []
-            for r in pacing_rows[:5]:
-                raw_grade = (r.get(_normalize_header('Grade Level')) or r.get('grade') or r.get('grade_level') or '')
-                sample_rows.append({
-                    'grade_level': raw_grade,
-                    'parsed_grades': _normalize_grade_tokens(str(raw_grade)),
-                })
-            resp['sample_rows'] = sample_rows
-        return resp
+            resp['sample_rows'] = _debug_sample_rows()
+        return resp, iter(())
     # If we confidently know this grade is not allowed for this school, short-circuit with empty results
-    if q_grade and matching_rows and allowed_grades:
-        if selected_grade_norm not in set(allowed_grades):
+    if q_grade and profile is not None and profile['grade_mask']:
+        if not profile['grade_mask'] & selected_bit:
             resp = {
-                'results': [],
                 'message': 'Information not available for this grade at this school.',
                 'selected_school': q_school,
                 'selected_grade': selected_grade_norm
@@ -850,87 +1375,382 @@ def build_search(params: dict):
             if debug_flag:
                 resp['allowed_grades'] = allowed_grades
                 # Show how pacing rows would parse for grade matching
+                resp['sample_rows'] = _debug_sample_rows()
+            return resp, iter(())
+    groups = _pacing_groups()
+    if resolved_curriculum:
+        group = groups.get(profile['curriculum_norm'], _NO_PACING)
+    else:
+        group = groups[None]
+    candidates = group['by_grade'].get(selected_bit, []) if q_grade else group['all']
+
+    district_value = eff_district or q_district
+    projected = None
+    if fields is not None:
+        getters = {
+            'district': lambda rec, window: district_value,
+            'school': lambda rec, window: q_school,
+            'grade': lambda rec, window: str(rec['grade']),
+            'curriculum': lambda rec, window: resolved_curriculum or rec['curriculum'],
+            'module_number': lambda rec, window: str(rec['module_number']),
+            'module_title': lambda rec, window: rec['module_title'],
+            'essential_question': lambda rec, window: rec['essential_question'],
+            'questions': lambda rec, window: rec['questions'],
+            'text_genres': lambda rec, window: rec['text_genres'],
+            'genres': lambda rec, window: rec['genres'],
+            'books': lambda rec, window: rec['books_raw'] if raw_fragments else rec['books'],
+            'books_json': lambda rec, window: rec['books_json_raw'] if raw_fragments else rec['books_json'],
+            'books_source': lambda rec, window: 'enumerated_strict',
+            'dateRange': lambda rec, window: {'start': window[0], 'end': window[1]},
+            'start_md': lambda rec, window: rec['start_md'],
+            'end_md': lambda rec, window: rec['end_md'],
+        }
+        # dateRange exists only for dated searches; bounds may be requested explicitly
+        projected = [(name, getters[name]) for name in SEARCH_FIELDS
+                     if name in fields and (name != 'dateRange' or ref is not None)]
+
+    def hits():
+        window = None
+        for position in range(start, len(candidates)):
+            rec = candidates[position]
+            if ref is not None:
                 try:
-                    pacing_rows = _fetch_pacing_csv()
+                    start_dt, end_dt = _resolve_range(rec['start_md'], rec['end_md'], ref)
                 except Exception:
-                    pacing_rows = []
-                sample_rows = []
-                for r in pacing_rows[:5]:
-                    raw_grade = (r.get(_normalize_header('Grade Level')) or r.get('grade') or r.get('grade_level') or '')
-                    sample_rows.append({
-                        'grade_level': raw_grade,
-                        'parsed_grades': _normalize_grade_tokens(str(raw_grade)),
-                    })
-                resp['sample_rows'] = sample_rows
-            return resp
+                    continue
+                if not (start_dt <= ref <= end_dt):
+                    continue
+                window = (start_dt.isoformat(), end_dt.isoformat())
+            if projected is not None:
+                yield position, {name: get(rec, window) for name, get in projected}
+                continue
+            item = {
+                'district': district_value,
+                'school': q_school,
+                'grade': str(rec['grade']),
+                'curriculum': resolved_curriculum or rec['curriculum'],
+                'module_number': str(rec['module_number']),
+                'module_title': rec['module_title'],
+                'essential_question': rec['essential_question'],
+                'questions': rec['questions'],
+                'text_genres': rec['text_genres'],
+                'genres': rec['genres'],
+                'books': rec['books_raw'] if raw_fragments else rec['books'],
+                'books_json': rec['books_json_raw'] if raw_fragments else rec['books_json'],
+                'books_source': 'enumerated_strict',
+            }
+            if window is not None:
+                item['dateRange'] = {'start': window[0], 'end': window[1]}
+            if include_bounds:
+                item['start_md'] = rec['start_md']
+                item['end_md'] = rec['end_md']
+            yield position, item
+
+    head = {}
+    if debug_flag:
+        head['selected_school'] = q_school
+        head['selected_grade'] = selected_grade_norm
+        head['allowed_grades'] = allowed_grades
+        head['sample_rows'] = _debug_sample_rows()
+    return head, hits()
+
+
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+
+def build_typeahead(params: dict):
+    """
+    Schools whose name (or DBN) matches what the user has typed so far.
+    Params: q, optional district, optional limit (default 10, max 50).
+    """
+    q = (params.get('q') or '').strip()
+    district = (params.get('district') or '').strip()
     try:
-        pacing_rows = _fetch_pacing_csv()
-    except Exception:
-        pacing_rows = []
+        limit = int(params.get('limit') or TYPEAHEAD_DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        limit = TYPEAHEAD_DEFAULT_LIMIT
+    limit = max(1, min(limit, TYPEAHEAD_MAX_LIMIT))
+    index = _typeahead_index()
+    allowed = index.district_ids(district) if district else None
     results = []
-    sample_rows = []
-    for r in pacing_rows:
-        curriculum = (r.get(_normalize_header('Curriculum')) or r.get('curriculum') or '').strip()
-        grade = (r.get(_normalize_header('Grade Level')) or r.get('grade') or r.get('grade_level') or '').strip()
-        row_grades = _normalize_grade_tokens(str(grade))
-        if debug_flag and len(sample_rows) < 5:
-            sample_rows.append({
-                'grade_level': grade,
-                'parsed_grades': row_grades,
+    for kind, entry in index.search(q, limit=limit, allowed=allowed):
+        item = {
+            'district': entry['district'],
+            'school': entry['school'],
+            'grades': entry['grades'],
+            'match': kind,
+        }
+        if entry.get('dbn'):
+            item['dbn'] = entry['dbn']
+        results.append(item)
+    return {'q': q, 'results': results}
+
+
+KEYWORD_DEFAULT_LIMIT = 20
+KEYWORD_MAX_LIMIT = 100
+
+
+def build_keyword_search(params: dict):
+    """
+    Modules whose title, essential questions or genres mention the query words.
+    Params: q, optional curriculum, optional grade, optional limit (default 20, max 100).
+    """
+    q = (params.get('q') or '').strip()
+    q_curriculum = (params.get('curriculum') or '').strip()
+    q_grade = (params.get('grade') or '').strip()
+    try:
+        limit = int(params.get('limit') or KEYWORD_DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        limit = KEYWORD_DEFAULT_LIMIT
+    limit = max(1, min(limit, KEYWORD_MAX_LIMIT))
+    text = _text_index()
+    allowed = None
+    if q_curriculum:
+        allowed = text['by_curriculum'].get(_normalize_curriculum_text(q_curriculum), set())
+    if q_grade:
+        grade_ids = text['by_grade'].get(_normalize_selected_grade(q_grade), set())
+        allowed = grade_ids if allowed is None else allowed & grade_ids
+    results = []
+    for doc_id, score, matched in text['index'].search(q, limit=limit, allowed=allowed):
+        rec = text['records'][doc_id]
+        results.append({
+            'curriculum': rec['curriculum'],
+            'grade': str(rec['grade']),
+            'module_number': str(rec['module_number']),
+            'module_title': rec['module_title'],
+            'essential_question': rec['essential_question'],
+            'questions': rec['questions'],
+            'genres': rec['genres'],
+            'start_md': rec['start_md'],
+            'end_md': rec['end_md'],
+            'score': score,
+            'matched': matched,
+        })
+    return {'q': q, 'results': results}
+
+
+def _parse_iso_date(value: str):
+    try:
+        y, m, d = [int(x) for x in str(value or '').strip().split('-')]
+        return date(y, m, d)
+    except Exception:
+        return None
+
+
+def build_books(params: dict):
+    head, rows = stream_books(params)
+    return {**head, 'results': list(rows)}
+
+
+def stream_books(params: dict):
+    """
+    Which modules assign a book, when, and which schools read it, as
+    (head, rows) for streamed responses; build_books collects the rows.
+    Params:
+      title or url   book to look up; titles match exactly after normalization,
+                     falling back to titles that contain the text
+      date           only modules whose window contains this YYYY-MM-DD date
+      from, to       only modules whose window overlaps this date span
+      district, grade
+                     narrow the schools (and, for grade, the modules)
+    """
+    q_title = (params.get('title') or '').strip()
+    q_url = (params.get('url') or '').strip()
+    q_district = _normalize_lookup_text(params.get('district') or '')
+    q_grade = (params.get('grade') or '').strip()
+    selected_grade = _normalize_selected_grade(q_grade) if q_grade else ''
+    q_date = _parse_iso_date(params.get('date'))
+    first = q_date or _parse_iso_date(params.get('from'))
+    last = q_date or _parse_iso_date(params.get('to'))
+    if first and not last:
+        last = first
+    if last and not first:
+        first = last
+
+    books = _books_index()
+    match = 'exact'
+    if q_url:
+        hits = books['by_url'].get(_book_url_key(q_url), [])
+    else:
+        key = _book_key(q_title)
+        hits = books['by_title'].get(key, []) if key else []
+        if key and not hits:
+            from api._typeahead import fold
+            match = 'partial'
+            folded = fold(key)
+            for folded_title, title in books['titles']:
+                if folded in folded_title:
+                    hits = hits + books['by_title'][title]
+
+    schools_by_cg = _schools_by_curriculum_grade()
+
+    def rows():
+        for rec, book in hits:
+            if selected_grade and not rec['grade_mask'] & _grades.bit(selected_grade):
+                continue
+            window = None
+            if first is not None:
+                window = _module_window_overlapping(rec['start_md'], rec['end_md'], first, last)
+                if window is None:
+                    continue
+            grades = [selected_grade] if selected_grade else rec['row_grades']
+            groups = [schools_by_cg.get((rec['curriculum_norm'], g), []) for g in grades]
+            if len(groups) == 1:
+                schools = groups[0]
+            else:
+                # A multi-grade pacing row: union its grades' schools, back in sorted order
+                unique = {(ref['district'], ref['school']): ref for group in groups for ref in group}
+                schools = [unique[k] for k in sorted(unique)]
+            if q_district:
+                schools = [ref for ref in schools if _normalize_lookup_text(ref['district']) == q_district]
+                if not schools:
+                    continue
+            item = {
+                'title': book['title'],
+                'url': book.get('url'),
+                'curriculum': rec['curriculum'],
+                'grade': str(rec['grade']),
+                'module_number': str(rec['module_number']),
+                'module_title': rec['module_title'],
+                'start_md': rec['start_md'],
+                'end_md': rec['end_md'],
+                'schools': list(schools),
+                'school_count': len(schools),
+            }
+            if window is not None:
+                item['dateRange'] = {'start': window[0].isoformat(), 'end': window[1].isoformat()}
+            yield item
+
+    return {'match': match if hits else None}, rows()
+
+
+CALENDAR_MAX_DAYS = 366
+
+
+def build_calendar(params: dict):
+    """
+    Day-by-day active modules for one curriculum (or school) and grade.
+    Params: grade, plus curriculum or school (+ optional district), and the
+    from/to YYYY-MM-DD span (default: 30 days from today, at most 366 days).
+    Output:
+      {"days": [{"date": "2025-10-01", "module_numbers": ["2"]}, ...],
+       "modules": [{"module_number", "module_title", "start_md", "end_md"}, ...]}
+    """
+    from datetime import timedelta
+    q_grade = _normalize_selected_grade((params.get('grade') or '').strip())
+    q_curriculum = (params.get('curriculum') or '').strip()
+    q_school = (params.get('school') or '').strip()
+    q_district = _normalize_lookup_text(params.get('district') or '')
+    first = _parse_iso_date(params.get('from')) or date.today()
+    last = _parse_iso_date(params.get('to')) or first + timedelta(days=29)
+    if last < first:
+        first, last = last, first
+    last = min(last, first + timedelta(days=CALENDAR_MAX_DAYS - 1))
+    if q_school and not q_curriculum:
+        profile = _school_profile_table().get((_normalize_lookup_text(q_school), q_district or None))
+        if profile is not None:
+            q_curriculum = profile['curriculum']
+
+    pacing = _pacing_index()
+    calendar = _calendar_index()
+    curriculum_norm = _normalize_curriculum_text(q_curriculum)
+    wanted = {
+        module_id for module_id, rec in enumerate(pacing['searchable'])
+        if (not q_grade or rec['grade_mask'] & _grades.bit(q_grade))
+        and (not curriculum_norm or rec['curriculum_norm'] == curriculum_norm)
+    }
+    dates = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    days = []
+    used: dict[int, dict] = {}
+    for day, module_ids in zip(dates, calendar.active(dates)):
+        numbers = []
+        for module_id in module_ids:
+            if module_id not in wanted:
+                continue
+            rec = pacing['searchable'][module_id]
+            numbers.append(str(rec['module_number']))
+            used.setdefault(module_id, {
+                'curriculum': rec['curriculum'],
+                'module_number': str(rec['module_number']),
+                'module_title': rec['module_title'],
+                'start_md': rec['start_md'],
+                'end_md': rec['end_md'],
             })
-        start_md = (r.get(_normalize_header('start_md')) or r.get('start_md') or r.get('start') or '').strip()
-        end_md = (r.get(_normalize_header('end_md')) or r.get('end_md') or r.get('end') or '').strip()
-        if not (start_md and end_md):
-            dr = (r.get(_normalize_header('Date Range')) or r.get('date_range') or '').strip()
-            s_md, e_md = _split_date_range(dr)
-            start_md = start_md or s_md
-            end_md = end_md or e_md
-        module_number = (r.get(_normalize_header('Module')) or r.get('module') or r.get('module_number') or '').strip()
-        module_title = normalize_text((r.get(_normalize_header('Theme')) or r.get('module_title') or r.get('theme') or '').strip())
-        essential_question = normalize_text((r.get(_normalize_header('Essential Questions')) or r.get('essential_question') or '').strip())
-        text_genres = normalize_text((r.get(_normalize_header('Text Genres')) or r.get('text_genres') or '').strip())
-        # Build books strictly from enumerated Reading List columns
-        books_items = _collect_reading_list_items_strict(r)
-        if not (curriculum and grade and start_md and end_md and module_number):
-            continue
-        if resolved_curriculum and _normalize_curriculum_text(curriculum) != _normalize_curriculum_text(resolved_curriculum):
+        days.append({'date': day.isoformat(), 'module_numbers': numbers})
+    return {
+        'curriculum': q_curriculum,
+        'grade': q_grade,
+        'from': first.isoformat(),
+        'to': last.isoformat(),
+        'days': days,
+        'modules': [used[m] for m in sorted(used)],
+    }
+
+
+ACTIVE_REPORT_COLUMNS = (
+    'district', 'school', 'curriculum', 'grade', 'module_number', 'module_title', 'start', 'end',
+)
+
+
+def iter_active_modules(on: date, district: str = ''):
+    """
+    Yield one row per (school, grade, module active on `on`) for every school in
+    district, or citywide when district is empty. Schools resolve as in /search
+    (curriculum of the first row, grades unioned, high schools and grades 9-12
+    skipped), and a
+    school grade with no active module yields a row with an empty module.
+
+    Active modules are found once for the date (see api/_calendar.py) and grouped
+    by (curriculum, grade), not matched per school, and rows are produced lazily
+    so callers can stream them.
+    """
+    schools = _snapshot_or_none('schools')
+    profiles = _school_profile_list_of(schools) if schools is not None else []
+    pacing = _pacing_index()
+    calendar = _calendar_index()
+    q_district = _normalize_lookup_text(district)
+    # Every module active on `on`, grouped once by (curriculum, grade) and by grade
+    # alone (for schools without a curriculum, which /search matches against all)
+    by_key: dict[tuple, list] = {}
+    by_grade: dict[str, list] = {}
+    for module_id in calendar.active([on])[0]:
+        rec = pacing['searchable'][module_id]
+        start_dt, end_dt = calendar.window(module_id, on)
+        hit = (rec, start_dt.isoformat(), end_dt.isoformat())
+        for grade in rec['row_grades']:
+            by_key.setdefault((rec['curriculum_norm'], grade), []).append(hit)
+            by_grade.setdefault(grade, []).append(hit)
+
+    def active_for(curriculum_norm: str, grade: str) -> list:
+        if curriculum_norm:
+            return by_key.get((curriculum_norm, grade), [])
+        return by_grade.get(grade, [])
+
+    for profile in profiles:
+        if profile['high_school']:
             continue
-        if q_grade and selected_grade_norm not in row_grades:
+        if q_district and _normalize_lookup_text(profile['district']) != q_district:
             continue
-        if ref is not None:
-            try:
-                start_dt, end_dt = _resolve_range(start_md, end_md, ref)
-            except Exception:
-                continue
-            if not (start_dt <= ref <= end_dt):
+        curriculum_norm = profile['curriculum_norm']
+        for grade in profile['grades']:
+            if _grades.bit(grade) & _grades.HS_MASK:
+                # /search short-circuits high-school grades
                 continue
-            start_iso = start_dt.isoformat()
-            end_iso = end_dt.isoformat()
-        item = {
-            'district': eff_district or q_district,
-            'school': q_school,
-            'grade': str(grade),
-            'curriculum': resolved_curriculum or curriculum,
-            'module_number': str(module_number),
-            'module_title': module_title,
-            'essential_question': essential_question,
-            'questions': split_questions(essential_question or (r.get(_normalize_header('Essential Questions')) or '')),
-            'text_genres': text_genres,
-            'genres': split_genres(text_genres),
-            'books': books_items,
-            'books_json': json.dumps(books_items, ensure_ascii=False),
-            'books_source': 'enumerated_strict',
-        }
-        if ref is not None:
-            item['dateRange'] = {'start': start_iso, 'end': end_iso}
-        results.append(item)
-    out = {'results': results}
-    if debug_flag:
-        out['selected_school'] = q_school
-        out['selected_grade'] = selected_grade_norm
-        out['allowed_grades'] = allowed_grades
-        out['sample_rows'] = sample_rows
-    return out
+            hits = active_for(curriculum_norm, grade)
+            if not hits:
+                yield {
+                    'district': profile['district'], 'school': profile['school'],
+                    'curriculum': profile['curriculum'], 'grade': grade,
+                    'module_number': '', 'module_title': '', 'start': '', 'end': '',
+                }
+            for rec, start_iso, end_iso in hits:
+                yield {
+                    'district': profile['district'], 'school': profile['school'],
+                    'curriculum': profile['curriculum'] or rec['curriculum'], 'grade': grade,
+                    'module_number': str(rec['module_number']), 'module_title': rec['module_title'],
+                    'start': start_iso, 'end': end_iso,
+                }
 
 
 def build_school_grades():
@@ -944,10 +1764,7 @@ def build_school_grades():
         ]
       }
     """
-    try:
-        schools_rows = _fetch_schools_csv()
-    except Exception:
-        schools_rows = []
+    schools_rows = _load_rows('schools')
     district_candidates = [
         _normalize_header('District #'),
         'district_#',
@@ -984,3 +1801,102 @@ def build_school_grades():
         if district and school:
             items.append({'district': district, 'school': school, 'grades': grades})
     return {'items': items}
+
+
+def build_debug():
+    """Internal state for operators: loaded snapshots, their last change sets and per-row cache reuse."""
+    return {
+        'data_source': DATA_SOURCE,
+        'snapshot_file': SNAPSHOT_FILE or None,
+        'generation': ENGINE.generation,
+        'snapshots': ENGINE.describe(),
+        'upstream': _upstream.describe(),
+    }
+
+
+def build_memory_report() -> dict:
+    """
+    Bytes held by each loaded structure (see api/_memsize.py): per snapshot its
+    raw rows, per-row records, compiled indexes and row cache, then the
+    materialized /meta payload and the encoded response bodies. Nothing is
+    loaded or built here; run /api/warmup first to see the fully built state.
+    """
+    from api import _compress, _memsize
+    sizer = _memsize.Sizer()
+    snapshots = {}
+    total = 0
+    for name, snap in sorted(ENGINE.snapshots().items()):
+        kinds: dict[str, int] = {}
+        detail = {}
+        for kind, key, obj in snap.parts():
+            size = sizer.size(obj)
+            kinds[kind] = kinds.get(kind, 0) + size
+            detail[key] = size
+        snap_total = sum(kinds.values())
+        total += snap_total
+        snapshots[name] = {
+            'version': snap.version,
+            'rows': len(snap.rows),
+            'bytes': kinds,
+            'detail': detail,
+            'total_bytes': snap_total,
+            'bytes_per_row': round(snap_total / len(snap.rows), 1) if len(snap.rows) else None,
+        }
+    caches = {
+        'meta': sizer.size(_META_CACHE),
+        'response_bodies': sizer.size(_compress.CACHE.items()),
+    }
+    total += sum(caches.values())
+    return {
+        'process': _memsize.process_rss(),
+        'snapshots': snapshots,
+        'caches': caches,
+        'total_bytes': total,
+    }
+
+
+def _timed_step(steps: list, name: str, fn) -> None:
+    t0 = time.perf_counter()
+    step = {'step': name}
+    try:
+        fn()
+        step['ok'] = True
+    except Exception as e:  # noqa: BLE001
+        step['ok'] = False
+        step['error'] = str(e)
+    step['ms'] = round((time.perf_counter() - t0) * 1000, 2)
+    steps.append(step)
+
+
+# Everything a cold worker would otherwise build on its first requests, in dependency order.
+# Loads raise so warmup can report them; the rest degrade to empty like the builders do.
+WARMUP_STEPS = [
+    ('load_schools', lambda: ENGINE.snapshot('schools')),
+    ('load_pacing', lambda: ENGINE.snapshot('pacing')),
+    ('index_schools', _schools_index),
+    ('index_pacing', _pacing_index),
+    ('index_typeahead', _typeahead_index),
+    ('index_books', _books_index),
+    ('index_text', _text_index),
+    ('index_calendar', _calendar_index),
+    ('index_schools_by_curriculum_grade', _schools_by_curriculum_grade),
+    ('index_pacing_groups', _pacing_groups),
+    ('index_school_profiles', _school_profile_table),
+    ('materialize_meta', _materialized_meta),
+]
+
+
+def warmup() -> dict:
+    """
+    Load both sheets, compile every index and materialize the /meta payload so the
+    first real request is served warm. Returns per-step timings in milliseconds.
+    """
+    t0 = time.perf_counter()
+    steps: list[dict] = []
+    for name, fn in WARMUP_STEPS:
+        _timed_step(steps, name, fn)
+    return {
+        'ok': all(s['ok'] for s in steps),
+        'steps': steps,
+        'total_ms': round((time.perf_counter() - t0) * 1000, 2),
+    }
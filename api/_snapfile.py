@@ -0,0 +1,276 @@
+"""
+Host-wide snapshot file shared by every worker process.
+
+One process (whichever wins the lock) fetches both sheets and writes an
+immutable binary snapshot; every worker memory-maps it read-only. Workers on a
+host therefore share one copy of the sheet data through the page cache, and
+Google is hit once per host per TTL instead of once per worker.
+
+File layout (header little-endian; arrays in native byte order, since the
+file never leaves the host that wrote it):
+  header   magic, format, table count, version, created_at, string count, blob length,
+           content digest (blake2b-128 of everything after the header)
+  strings  uint32 offsets[count + 1] followed by one UTF-8 blob (every distinct cell once)
+  tables   per table: name id, column count, row count, column name ids,
+           then cell string ids stored column by column
+
+Files are replaced with os.replace(), so a reader always maps either the old
+or the new file in full, never a partial write. A refresh that fetches the same
+content rewrites the file under the same version, so workers keep their map.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import time
+import logging
+from array import array
+from collections.abc import Mapping, Sequence
+
+from api import _intern
+
+logger = logging.getLogger("api")
+
+MAGIC = b'NYCRSNAP'
+FORMAT = 2
+HEADER = struct.Struct('<8sIIQdQQ16s')
+TABLE = struct.Struct('<III')
+
+
+def _u32(values) -> bytes:
+    return array('I', values).tobytes()
+
+
+def _pad4(n: int) -> int:
+    return (4 - n % 4) % 4
+
+
+def encode_tables(tables: dict) -> tuple[tuple, list, bytes]:
+    """
+    Encode {name: rows} as (header counts, body parts, digest): the body is
+    everything after the header, and the digest identifies its content.
+    """
+    strings: dict[str, int] = {}
+
+    def sid(value) -> int:
+        s = '' if value is None else str(value)
+        found = strings.get(s)
+        if found is None:
+            found = strings[s] = len(strings)
+        return found
+
+    sid('')
+    table_parts = []
+    for name, rows in tables.items():
+        columns: list[str] = []
+        seen = set()
+        for r in rows:
+            for k in r.keys():
+                if k not in seen:
+                    seen.add(k)
+                    columns.append(k)
+        cells = [sid(r.get(c, '')) for c in columns for r in rows]
+        table_parts.append(TABLE.pack(sid(name), len(columns), len(rows)) + _u32(sid(c) for c in columns) + _u32(cells))
+
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = [0]
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+    blob = b''.join(encoded)
+    body = [
+        _u32(offsets),
+        blob,
+        b'\0' * _pad4(len(blob)),
+    ]
+    body.extend(table_parts)
+    digest = hashlib.blake2b(digest_size=16)
+    for part in body:
+        digest.update(part)
+    return (len(table_parts), len(encoded), len(blob)), body, digest.digest()
+
+
+def write_snapshot(path: str, tables: dict, version: int, encoded: tuple | None = None) -> None:
+    """
+    Write {name: rows} to path atomically. Rows are dicts sharing one header order.
+    encoded is encode_tables(tables) when the caller already has it.
+    """
+    (n_tables, n_strings, blob_len), body, digest = encoded or encode_tables(tables)
+    header = HEADER.pack(MAGIC, FORMAT, n_tables, version, time.time(), n_strings, blob_len, digest)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        for part in body:
+            f.write(part)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_header(path: str):
+    """Return (version, created_at, digest) of the snapshot at path, or None if missing/invalid."""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(raw) < HEADER.size:
+        return None
+    magic, fmt, _, version, created_at, _, _, digest = HEADER.unpack(raw)
+    if magic != MAGIC or fmt != FORMAT:
+        return None
+    return version, created_at, digest
+
+
+class MappedRow(Mapping):
+    """Read-only dict-like view of one row; cells are decoded from the map on access."""
+
+    __slots__ = ('_table', '_i')
+
+    def __init__(self, table, i: int):
+        self._table = table
+        self._i = i
+
+    def __getitem__(self, key):
+        col = self._table.column_index[key]
+        return self._table.cell(col, self._i)
+
+    def get(self, key, default=None):
+        col = self._table.column_index.get(key)
+        if col is None:
+            return default
+        return self._table.cell(col, self._i)
+
+    def __iter__(self):
+        return iter(self._table.columns)
+
+    def __len__(self):
+        return len(self._table.columns)
+
+
+class MappedRows(Sequence):
+    """Sequence of MappedRow over one table; shares the map with every other view."""
+
+    def __init__(self, snapshot, columns: list[str], n_rows: int, cells):
+        self.snapshot = snapshot
+        self.columns = columns
+        self.column_index = {c: i for i, c in enumerate(columns)}
+        self.n_rows = n_rows
+        self._cells = cells
+
+    def cell(self, col: int, i: int) -> str:
+        return self.snapshot.string(self._cells[col * self.n_rows + i])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [MappedRow(self, j) for j in range(*i.indices(self.n_rows))]
+        if i < 0:
+            i += self.n_rows
+        if not 0 <= i < self.n_rows:
+            raise IndexError(i)
+        return MappedRow(self, i)
+
+    def __len__(self):
+        return self.n_rows
+
+
+class MappedSnapshot:
+    """A snapshot file mapped read-only; tables are exposed as MappedRows."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        magic, fmt, n_tables, self.version, self.created_at, n_strings, blob_len, self.digest = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            raise ValueError(f'not a snapshot file: {path}')
+        pos = HEADER.size
+        self._offsets = view[pos:pos + 4 * (n_strings + 1)].cast('I')
+        pos += 4 * (n_strings + 1)
+        self._blob_start = pos
+        pos += blob_len + _pad4(blob_len)
+        self.tables: dict[str, MappedRows] = {}
+        for _ in range(n_tables):
+            name_id, n_cols, n_rows = TABLE.unpack_from(view, pos)
+            pos += TABLE.size
+            col_ids = view[pos:pos + 4 * n_cols].cast('I')
+            pos += 4 * n_cols
+            cells = view[pos:pos + 4 * n_cols * n_rows].cast('I')
+            pos += 4 * n_cols * n_rows
+            columns = [self.string(c) for c in col_ids]
+            self.tables[self.string(name_id)] = MappedRows(self, columns, n_rows, cells)
+
+    def string(self, i: int) -> str:
+        a = self._blob_start + self._offsets[i]
+        b = self._blob_start + self._offsets[i + 1]
+        # The file stores each distinct string once; interning keeps it that way in memory
+        return _intern.cell(self._mm[a:b].decode('utf-8'))
+
+
+class SharedSnapshotStore:
+    """
+    Keeps this process pointed at the newest snapshot file and refreshes the file
+    from the sheet loaders when it is older than ttl. Only the lock holder fetches;
+    everyone else keeps reading the current file.
+    """
+
+    def __init__(self, path: str, loaders: dict, ttl: float):
+        self.path = path
+        self.loaders = dict(loaders)
+        self.ttl = ttl
+        self._current: MappedSnapshot | None = None
+        self._retry_at = 0.0
+
+    def _stale(self, header) -> bool:
+        return header is None or time.time() - header[1] >= self.ttl
+
+    def refresh(self, force: bool = False, block: bool = False) -> bool:
+        """
+        Fetch every sheet and rewrite the file if it is stale (or force). Returns True
+        if written. The version only moves when the fetched content differs.
+        """
+        try:
+            import fcntl
+        except ImportError:  # pragma: no cover - non-POSIX hosts fall back to unlocked writes
+            fcntl = None
+        with open(self.path + '.lock', 'a+') as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | (0 if block else fcntl.LOCK_NB))
+                except BlockingIOError:
+                    return False
+            header = read_header(self.path)
+            if not force and not self._stale(header):
+                return False
+            tables = {name: loader() for name, loader in self.loaders.items()}
+            encoded = encode_tables(tables)
+            if header is not None and header[2] == encoded[2]:
+                # Unchanged: rewrite only to restamp created_at, so no worker remaps
+                version = header[0]
+            else:
+                version = (header[0] if header else 0) + 1
+            write_snapshot(self.path, tables, version, encoded=encoded)
+            logger.info("[snapfile] wrote %s version %s", self.path, version)
+            return True
+
+    def current(self) -> MappedSnapshot:
+        header = read_header(self.path)
+        if self._stale(header) and time.time() >= self._retry_at:
+            try:
+                # Block only when there is nothing to serve yet
+                self.refresh(block=header is None)
+            except Exception as e:  # noqa: BLE001
+                self._retry_at = time.time() + min(self.ttl, 30.0)
+                if header is None:
+                    raise
+                logger.warning("[snapfile] refresh failed, serving version %s: %s", header[0], e)
+            header = read_header(self.path)
+        if header is None:
+            raise RuntimeError(f'no snapshot available at {self.path}')
+        if self._current is None or self._current.version != header[0]:
+            # Swap by reference; requests still holding the old map keep a consistent view
+            self._current = MappedSnapshot(self.path)
+        return self._current
+
+    def rows(self, name: str) -> MappedRows:
+        return self.current().tables[name]
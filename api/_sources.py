@@ -0,0 +1,204 @@
+"""
+Pluggable data sources for the engine.
+
+A source turns one table name ('schools' or 'pacing') into rows shaped exactly
+like a normalized Google Sheets CSV export (lowercase, underscore headers), so
+every index and builder works the same whichever backend supplied the data.
+
+  SheetSource      live Google Sheets (the fetchers in api/_shared.py)
+  LocalFileSource  data/curricula.json-style nested records, or a directory
+                   holding exported schools.csv / pacing.csv
+  FallbackSource   primary source, falling back to another when it fails
+"""
+import json
+import os
+import re
+import logging
+from datetime import date
+
+from api import _intern
+
+logger = logging.getLogger("api")
+
+TABLES = ('schools', 'pacing')
+
+# Reading list columns the strict collector understands (reading_list_1..20)
+MAX_READING_ITEMS = 20
+
+
+class DataSource:
+    name = ''
+
+    def load(self, table: str) -> list:
+        raise NotImplementedError
+
+    def loaders(self) -> dict:
+        return {t: (lambda t=t: self.load(t)) for t in TABLES}
+
+
+class SheetSource(DataSource):
+    name = 'sheets'
+
+    def __init__(self, fetchers: dict):
+        self.fetchers = dict(fetchers)
+
+    def load(self, table: str) -> list:
+        return self.fetchers[table]()
+
+
+class FallbackSource(DataSource):
+    """Serve from primary; if it raises, log and serve from fallback instead."""
+
+    def __init__(self, primary: DataSource, fallback: DataSource):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f'{primary.name}+{fallback.name}'
+
+    def load(self, table: str) -> list:
+        try:
+            return self.primary.load(table)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("[sources] %s load of %s failed, using %s: %s", self.primary.name, table, self.fallback.name, e)
+            return self.fallback.load(table)
+
+
+def _district_label(value: str) -> str:
+    """'District 1' -> '1', matching the sheet's 'District #' column."""
+    s = str(value or '').strip()
+    m = re.match(r'(?i)^district\s*#?\s*(\S+)$', s)
+    return m.group(1) if m else s
+
+
+def _iso_to_md(value: str) -> str:
+    """'2025-08-01' -> '8/1', the month/day form used by the pacing sheet."""
+    s = str(value or '').strip()
+    try:
+        d = date.fromisoformat(s)
+    except ValueError:
+        return s
+    return f"{d.month}/{d.day}"
+
+
+def _split_module_name(name: str) -> tuple[str, str]:
+    """'Module 1: Building a Community' -> ('1', 'Building a Community')."""
+    s = str(name or '').strip()
+    m = re.match(r'(?i)^module\s*(\d+)\s*[:.\-–]?\s*(.*)$', s)
+    if m:
+        return m.group(1), m.group(2).strip()
+    return '', s
+
+
+def _book_cells(book) -> tuple[str, str, str]:
+    if isinstance(book, dict):
+        return (
+            str(book.get('title') or '').strip(),
+            str(book.get('url') or '').strip(),
+            str(book.get('coverImageUrl') or book.get('coverimageurl') or '').strip(),
+        )
+    return str(book or '').strip(), '', ''
+
+
+def rows_from_records(records: list) -> dict:
+    """
+    Flatten nested {district, school, grade, curriculum, modules: [...]} records
+    into School Directories rows and Pacing Guide rows. Pacing is keyed by
+    (curriculum, grade, module); the first record that mentions a module wins.
+    """
+    schools = []
+    pacing = []
+    seen_modules = set()
+    for rec in records or []:
+        if not isinstance(rec, dict):
+            continue
+        curriculum = str(rec.get('curriculum') or '').strip()
+        grade = str(rec.get('grade') or '').strip()
+        schools.append({
+            'district_#': _district_label(rec.get('district')),
+            'school_name': str(rec.get('school') or '').strip(),
+            'curriculum': curriculum,
+            'grade': grade,
+        })
+        for mod in rec.get('modules') or []:
+            if not isinstance(mod, dict):
+                continue
+            number, title = _split_module_name(mod.get('name'))
+            number = str(mod.get('module') or mod.get('module_number') or number).strip()
+            key = (curriculum.lower(), grade.upper(), number)
+            if key in seen_modules:
+                continue
+            seen_modules.add(key)
+            row = {
+                'curriculum': curriculum,
+                'grade_level': grade,
+                'module': number,
+                'theme': str(mod.get('title') or title).strip(),
+                'start_md': _iso_to_md(mod.get('startDate')),
+                'end_md': _iso_to_md(mod.get('endDate')),
+                'essential_questions': str(mod.get('essentialQuestion') or '').strip(),
+                'text_genres': '\n'.join(mod.get('genres') or []),
+            }
+            for idx, book in enumerate((mod.get('books') or [])[:MAX_READING_ITEMS], start=1):
+                title_text, url, cover = _book_cells(book)
+                row[f'reading_list_{idx}'] = title_text
+                row[f'reading_url_{idx}'] = url
+                row[f'coverimageurl_{idx}'] = cover
+            pacing.append(row)
+    return {'schools': _uniform(schools), 'pacing': _uniform(pacing)}
+
+
+def _uniform(rows: list) -> list:
+    """Give every row the same keys in the same order, like a CSV export."""
+    columns: list[str] = []
+    seen = set()
+    for r in rows:
+        for k in r:
+            if k not in seen:
+                seen.add(k)
+                columns.append(k)
+    cell = _intern.cell
+    return [{c: cell(r.get(c, '')) for c in columns} for r in rows]
+
+
+class LocalFileSource(DataSource):
+    """
+    Network-free backend. path is either a JSON file of nested records
+    (data/curricula.json) or a directory of exported schools.csv / pacing.csv.
+    Parsed tables are reused until the file's mtime changes, so the engine keeps
+    its indexes across TTL refreshes when nothing on disk moved.
+    """
+
+    name = 'local'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._cache: dict[str, tuple[float, list]] = {}
+
+    def _file_for(self, table: str) -> str:
+        if os.path.isdir(self.path):
+            for fname in (f'{table}.csv', 'curricula.json'):
+                candidate = os.path.join(self.path, fname)
+                if os.path.exists(candidate):
+                    return candidate
+            raise FileNotFoundError(f'no {table}.csv or curricula.json in {self.path}')
+        return self.path
+
+    def load(self, table: str) -> list:
+        fpath = self._file_for(table)
+        mtime = os.path.getmtime(fpath)
+        cached = self._cache.get(table)
+        if cached and cached[0] == mtime and cached[1] is not None:
+            return cached[1]
+        if fpath.lower().endswith('.csv'):
+            from api._shared import _csv_from_text
+            with open(fpath, encoding='utf-8', errors='replace') as f:
+                rows = _csv_from_text(f.read().lstrip('\ufeff').strip())
+        else:
+            with open(fpath, encoding='utf-8') as f:
+                tables = rows_from_records(json.load(f))
+            # One JSON file feeds both tables; cache the sibling too so it is parsed once
+            for name, parsed in tables.items():
+                if self._file_for(name) == fpath:
+                    self._cache[name] = (mtime, parsed)
+            return tables[table]
+        self._cache[table] = (mtime, rows)
+        return rows
@@ -0,0 +1,70 @@
+"""
+Incremental encoders for streamed responses.
+
+Each function takes an iterable of row dicts and yields encoded chunks as rows
+arrive, so a response (or a CLI writing to stdout) never holds the full result.
+"""
+import csv
+import io
+from collections.abc import Iterator
+
+from api import _json
+
+# Streams flush once this much output has accumulated, not once per row
+CHUNK_BYTES = 16 * 1024
+
+
+def batched(chunks, min_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """Coalesce small chunks into writes of at least min_bytes (the last may be shorter)."""
+    pending = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= min_bytes:
+            yield b''.join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield b''.join(pending)
+
+
+def iter_csv(rows, columns) -> Iterator[bytes]:
+    """Header line, then one CSV line per row (missing keys are blank)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator='\r\n')
+
+    def line(values) -> bytes:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerow(values)
+        return buf.getvalue().encode('utf-8')
+
+    yield line(columns)
+    for row in rows:
+        yield line(['' if row.get(c) is None else row.get(c) for c in columns])
+
+
+def iter_json_object(head: dict, key: str, rows) -> Iterator[bytes]:
+    """
+    A JSON object made of head's fields plus `key` holding every row as an
+    array, e.g. {"date": ..., "rows": [...]}. head must not contain key.
+    """
+    opening = _json.dumps(head)
+    opening = opening[:-1] + (b',' if len(opening) > 2 else b'')
+    yield opening + _json.dumps(key) + b':['
+    first = True
+    for row in rows:
+        yield (b'' if first else b',') + _json.dumps(row)
+        first = False
+    yield b']}'
+
+
+def iter_ndjson(head: dict, rows) -> Iterator[bytes]:
+    """
+    Newline-delimited JSON: head (the response's non-list fields, possibly {})
+    on the first line, then one line per row.
+    """
+    yield _json.dumps(head) + b'\n'
+    for row in rows:
+        yield _json.dumps(row) + b'\n'
@@ -0,0 +1,162 @@
+"""
+Typeahead over school names, built once per schools snapshot.
+
+Every (district, school) pair becomes one entry. Its name is split into folded
+tokens ("P.S. 015 Roberto Clemente" -> ps, 015, 15, ps015, ps15, roberto,
+clemente), plus the DBN when the sheet has one. All tokens sit in one sorted
+array, so a prefix lookup is a bisect range over it, a flattened prefix trie.
+An entry matches when every query token prefixes one of its tokens.
+
+When prefix matching finds fewer than `limit` entries, a trigram index fills
+the rest with the closest spellings, so "clemnte" still finds Clemente.
+"""
+import bisect
+import heapq
+import unicodedata
+
+from api._regex import regex
+
+_WORD = r'[a-z0-9]+'
+_SCHOOL_PREFIX = r'^[a-z]{1,3}$'
+
+# Share of a query's trigrams an entry must contain to count as a fuzzy match
+FUZZY_MIN_SCORE = 0.5
+
+
+def fold(text: str) -> str:
+    """Lowercase, strip accents and drop dots so 'P.S.' and 'PS' read the same."""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return text.lower().replace('.', '')
+
+
+def name_tokens(name: str) -> list[str]:
+    words = regex(_WORD).findall(fold(name))
+    tokens = list(words)
+    for i, word in enumerate(words):
+        if not word.isdigit():
+            continue
+        number = str(int(word))
+        if number != word:
+            tokens.append(number)
+        # School-number forms people type: ps15, ps015, is318, jhs54
+        if i > 0 and regex(_SCHOOL_PREFIX).match(words[i - 1]):
+            tokens.append(words[i - 1] + word)
+            tokens.append(words[i - 1] + number)
+    return tokens
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TypeaheadIndex:
+    """
+    entries: dicts with at least 'district' and 'school' (returned as-is), plus
+    optional 'dbn'. Ties between equally good matches go to the shorter name,
+    then to the earlier entry.
+    """
+
+    # Prefixes this short match most of the directory; their id sets are built up front
+    SHORT_PREFIX = 2
+
+    def __init__(self, entries: list[dict]):
+        names = [' '.join(regex(_WORD).findall(fold(e['school']))) for e in entries]
+        # Entry ids follow tie-break order, so "best of a tier" is just "lowest ids"
+        order = sorted(range(len(entries)), key=lambda i: (len(names[i]), i))
+        self.entries = [entries[i] for i in order]
+        self._names = [names[i] for i in order]
+        self._by_district: dict[str, set] = {}
+        postings: dict[str, set] = {}
+        grams: dict[str, list] = {}
+        for eid, entry in enumerate(self.entries):
+            tokens = name_tokens(entry['school'])
+            if entry.get('dbn'):
+                tokens.append(fold(entry['dbn']).replace(' ', ''))
+            self._by_district.setdefault(fold(entry['district']).strip(), set()).add(eid)
+            for tok in tokens:
+                postings.setdefault(tok, set()).add(eid)
+            for gram in _trigrams(self._names[eid]):
+                grams.setdefault(gram, []).append(eid)
+        self._exact = postings
+        self._tokens = sorted(postings)
+        self._postings = [postings[t] for t in self._tokens]
+        self._grams = grams
+        self._short: dict[str, set] = {}
+        for tok, ids in postings.items():
+            for n in range(1, min(len(tok), self.SHORT_PREFIX) + 1):
+                self._short.setdefault(tok[:n], set()).update(ids)
+        self._sorted_names = sorted((name, eid) for eid, name in enumerate(self._names))
+
+    def _prefix_ids(self, prefix: str) -> set:
+        if len(prefix) <= self.SHORT_PREFIX:
+            return self._short.get(prefix, set())
+        lo = bisect.bisect_left(self._tokens, prefix)
+        # '{' sorts right after 'z', so this is the end of the prefix range
+        hi = bisect.bisect_left(self._tokens, prefix + '{', lo)
+        if hi - lo == 1:
+            return self._postings[lo]
+        ids = set()
+        for posting in self._postings[lo:hi]:
+            ids |= posting
+        return ids
+
+    def _phrase_ids(self, phrase: str) -> set:
+        """Entries whose whole folded name starts with phrase."""
+        lo = bisect.bisect_left(self._sorted_names, (phrase,))
+        hi = bisect.bisect_left(self._sorted_names, (phrase + '{',), lo)
+        return {eid for _, eid in self._sorted_names[lo:hi]}
+
+    def _fuzzy_matches(self, text: str, allowed, exclude: set) -> list[tuple[float, int]]:
+        query = _trigrams(text)
+        hits: dict[int, int] = {}
+        for gram in query:
+            for eid in self._grams.get(gram, ()):
+                hits[eid] = hits.get(eid, 0) + 1
+        out = []
+        for eid, n in hits.items():
+            score = n / len(query)
+            if score < FUZZY_MIN_SCORE or eid in exclude or (allowed is not None and eid not in allowed):
+                continue
+            out.append((score, eid))
+        return out
+
+    def search(self, query: str, limit: int = 10, allowed=None) -> list[tuple[str, dict]]:
+        """
+        Top `limit` entries for query as (match_kind, entry), best first.
+        allowed optionally restricts results to a set of entry ids (see district_ids).
+
+        Prefix matches rank in tiers: every word typed in full and the name starts
+        with the query, then every word typed in full, then the name starts with
+        the query, then any other prefix match.
+        """
+        words = regex(_WORD).findall(fold(query))
+        if not words or limit <= 0:
+            return []
+        phrase = ' '.join(words)
+        matched = None
+        for word in sorted(words, key=len, reverse=True):
+            ids = self._prefix_ids(word)
+            matched = ids if matched is None else matched & ids
+        if allowed is not None:
+            matched = matched & allowed
+        exact = matched
+        for word in words:
+            exact = exact & self._exact.get(word, set())
+        phrase_ids = self._phrase_ids(phrase) & matched
+        tiers = [exact & phrase_ids, exact - phrase_ids, phrase_ids - exact, matched - exact - phrase_ids]
+
+        out = []
+        for tier in tiers:
+            if len(out) >= limit:
+                break
+            out.extend(('prefix', self.entries[eid]) for eid in heapq.nsmallest(limit - len(out), tier))
+        if len(out) < limit:
+            fuzzy = self._fuzzy_matches(phrase, allowed, matched)
+            for _, eid in heapq.nsmallest(limit - len(out), fuzzy, key=lambda p: (-p[0], p[1])):
+                out.append(('fuzzy', self.entries[eid]))
+        return out
+
+    def district_ids(self, district: str) -> set:
+        return self._by_district.get(fold(district).strip(), set())
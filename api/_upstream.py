@@ -0,0 +1,205 @@
+"""
+Guarded outbound HTTP for sheet fetches.
+
+Every GET to Google goes through fetch(), which adds three protections:
+
+  - a bounded semaphore (FETCH_CONCURRENCY) so a slow upstream can hold at most
+    that many worker threads; callers that cannot get a slot within
+    FETCH_QUEUE_SECONDS give up instead of queueing behind it
+  - a per-host circuit breaker: after BREAKER_FAILURES consecutive failed
+    fetches (each counted once, after its retries are exhausted) the host is
+    skipped for BREAKER_COOLDOWN_SECONDS, so loaders fail immediately and the
+    engine keeps serving the snapshot it already has; one probe is then let
+    through, and its result closes or re-opens the breaker
+  - retries with capped exponential backoff and full jitter for connection
+    errors, timeouts, 429 and 5xx (only these count toward the breaker); a
+    half-open probe gets a single attempt
+
+Errors surface as exceptions, exactly like a bare requests.get would raise, so
+the loaders' existing fallback handling is unchanged.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, '').strip() or default)
+    except ValueError:
+        return default
+
+
+FETCH_TIMEOUT_SECONDS = _env_float('FETCH_TIMEOUT_SECONDS', 20.0)
+FETCH_CONCURRENCY = max(1, int(_env_float('FETCH_CONCURRENCY', 4)))
+FETCH_QUEUE_SECONDS = _env_float('FETCH_QUEUE_SECONDS', 5.0)
+FETCH_RETRIES = max(0, int(_env_float('FETCH_RETRIES', 2)))
+FETCH_BACKOFF_SECONDS = _env_float('FETCH_BACKOFF_SECONDS', 0.5)
+FETCH_BACKOFF_MAX_SECONDS = _env_float('FETCH_BACKOFF_MAX_SECONDS', 4.0)
+BREAKER_FAILURES = max(1, int(_env_float('BREAKER_FAILURES', 5)))
+BREAKER_COOLDOWN_SECONDS = _env_float('BREAKER_COOLDOWN_SECONDS', 30.0)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+logger = logging.getLogger("api")
+
+_slots = threading.BoundedSemaphore(FETCH_CONCURRENCY)
+
+
+class CircuitOpen(RuntimeError):
+    """Raised without contacting the host while its breaker is open."""
+
+
+class FetchBusy(RuntimeError):
+    """Raised when no fetch slot frees up within FETCH_QUEUE_SECONDS."""
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, host: str, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        self.host = host
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error = ''
+        self.trips = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> tuple[bool, bool]:
+        """
+        (allowed, probe): whether a request may go out, and whether it is the
+        single half-open probe. Decided under the lock, so exactly one caller
+        gets probe=True per cooldown.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True, False
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True, True
+            self.rejected += 1
+            return False, False
+
+    def success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("[upstream] %s breaker closed", self.host)
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def failure(self, err: Exception):
+        with self._lock:
+            self.failures += 1
+            self.last_error = f'{type(err).__name__}: {err}'[:300]
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                    logger.warning("[upstream] %s breaker open for %ss after %d failures: %s",
+                                   self.host, self.cooldown, self.failures, self.last_error)
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+    def cancel_probe(self):
+        """Hand a half-open probe back unused, so the next caller may probe."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.time() - self.cooldown
+
+    def describe(self) -> dict:
+        with self._lock:
+            out = {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'last_error': self.last_error or None,
+            }
+            if self.state == self.OPEN:
+                out['retry_in_seconds'] = round(max(0.0, self.opened_at + self.cooldown - time.time()), 1)
+            return out
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(host: str) -> CircuitBreaker:
+    b = _breakers.get(host)
+    if b is None:
+        with _breakers_lock:
+            b = _breakers.setdefault(host, CircuitBreaker(host))
+    return b
+
+
+def backoff(attempt: int) -> float:
+    """Full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(FETCH_BACKOFF_MAX_SECONDS, FETCH_BACKOFF_SECONDS * (2 ** attempt)))
+
+
+def _retryable(err: Exception) -> bool:
+    status = getattr(getattr(err, 'response', None), 'status_code', None)
+    if status is not None:
+        return status in RETRY_STATUSES
+    import requests
+    return isinstance(err, (requests.ConnectionError, requests.Timeout))
+
+
+def fetch(url: str, headers: dict | None = None, timeout: float | None = None):
+    """GET url with the semaphore, breaker and retries; returns a response with a 2xx status."""
+    import requests
+    b = breaker(urlsplit(url).netloc)
+    allowed, probe = b.allow()
+    if not allowed:
+        raise CircuitOpen(f'{b.host} circuit open: {b.last_error}')
+    # The probe after a cooldown decides the breaker on one attempt
+    retries = 0 if probe else FETCH_RETRIES
+    err = None
+    attempt = 0
+    while True:
+        if not _slots.acquire(timeout=FETCH_QUEUE_SECONDS):
+            # Not the host's fault: no failure is counted
+            if probe:
+                b.cancel_probe()
+            raise FetchBusy(f'no fetch slot within {FETCH_QUEUE_SECONDS}s ({FETCH_CONCURRENCY} in flight)')
+        try:
+            resp = requests.get(url, headers=headers, timeout=timeout or FETCH_TIMEOUT_SECONDS)
+            resp.raise_for_status()
+        except Exception as e:  # noqa: BLE001
+            if not _retryable(e):
+                # e.g. 404 for a wrong gid: the host answered, so it is not an outage
+                b.success()
+                raise
+            # One failure per fetch, not per attempt; stop early if other
+            # fetches have opened the breaker in the meantime
+            if attempt >= retries or b.state == b.OPEN:
+                b.failure(e)
+                raise
+            err = e
+        else:
+            b.success()
+            return resp
+        finally:
+            _slots.release()
+        delay = backoff(attempt)
+        logger.info("[upstream] retry %d for %s in %.2fs: %s", attempt + 1, b.host, delay, err)
+        time.sleep(delay)
+        attempt += 1
+
+
+def describe() -> dict:
+    with _breakers_lock:
+        breakers = sorted(_breakers.items())
+    return {
+        'concurrency': FETCH_CONCURRENCY,
+        'timeout_seconds': FETCH_TIMEOUT_SECONDS,
+        'retries': FETCH_RETRIES,
+        'breakers': {host: b.describe() for host, b in breakers},
+    }
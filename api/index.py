@@ -1,14 +1,18 @@
-import json
-from flask import Flask, request, make_response, jsonify
+import logging
+import os
 
-from api._shared import build_meta, build_modules, build_search, build_school_grades
+from flask import Flask, Response, request, make_response, stream_with_context
+
+from api import _json
+
+# Data builders are imported inside each handler so /health never pays for
+# api._shared (and its fetch/parse stack) on a cold start.
 
 # Vercel: export a Flask WSGI app at module scope
 app = Flask(__name__)
 
 
-def json_utf8(data: dict, status: int = 200):
-    resp = make_response(jsonify(data), status)
+def _json_headers(resp):
     resp.headers['Content-Type'] = 'application/json; charset=utf-8'
     resp.headers['Access-Control-Allow-Origin'] = '*'
     resp.headers['Access-Control-Allow-Methods'] = 'GET,OPTIONS'
@@ -17,6 +21,280 @@ def json_utf8(data: dict, status: int = 200):
     return resp
 
 
+def json_utf8(data: dict, status: int = 200):
+    return _json_headers(make_response(_json.dumps(data), status))
+
+
+def json_cached(route: str, params: tuple, build, status: int = 200):
+    """
+    Like json_utf8, but the encoded body (and its gzip/brotli variant, per
+    Accept-Encoding) is cached per snapshot version, so a repeat request skips
+    the builder, the JSON encoder and the compressor.
+    """
+    from api._compress import encoded_body
+    from api._etag import matches, route_etag
+    from api._shared import data_tag, data_version
+    version = data_version()
+    tag = data_tag()
+    etag = route_etag(tag[1], route, params) if tag is not None and status == 200 else None
+    if etag is not None and matches(request.headers.get('If-None-Match', ''), etag):
+        # Answered from the tag alone: no builder, no encoder, no body
+        resp = _json_headers(make_response('', 304))
+        resp.headers.pop('Content-Type', None)
+        return _tag_headers(resp, route, tag[0], etag)
+    key = (version, route, params) if version is not None else None
+    body, encoding = encoded_body(key, request.headers.get('Accept-Encoding', ''), lambda: _json.dumps(build()))
+    resp = _json_headers(make_response(body, status))
+    if etag is not None:
+        _tag_headers(resp, route, tag[0], etag)
+    else:
+        resp.headers['Vary'] = 'Accept-Encoding'
+    if encoding != 'identity':
+        resp.headers['Content-Encoding'] = encoding
+    return resp
+
+
+def _tag_headers(resp, route: str, generation: int, etag: str):
+    from api._etag import cache_control
+    resp.headers['ETag'] = etag
+    resp.headers['X-Data-Version'] = str(generation)
+    resp.headers['Cache-Control'] = cache_control(route)
+    resp.headers['Vary'] = 'Accept-Encoding'
+    return resp
+
+
+def stream_rows(chunks, content_type: str, filename: str = ''):
+    """Stream pre-encoded chunks as they are produced (no body cache, no compression)."""
+    from api._stream import batched
+    resp = _json_headers(Response(stream_with_context(batched(chunks))))
+    resp.headers['Content-Type'] = content_type
+    if filename:
+        resp.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return resp
+
+
+NDJSON_TYPE = 'application/x-ndjson; charset=utf-8'
+
+
+def _wants_ndjson() -> bool:
+    """?format=ndjson, or an Accept header asking for NDJSON."""
+    fmt = (request.args.get('format') or '').strip().lower()
+    if fmt:
+        return fmt == 'ndjson'
+    accept = request.headers.get('Accept', '')
+    return 'application/x-ndjson' in accept or 'application/ndjson' in accept
+
+
+def stream_ndjson(stream):
+    """Stream a builder's (head, rows) pair as NDJSON: the head line, then one line per row."""
+    from api._stream import iter_ndjson
+    head, rows = stream
+    return stream_rows(iter_ndjson(head, rows), NDJSON_TYPE)
+
+
+def _log_meta_counts(data: dict):
+    try:
+        print('[api_meta] returning counts', {
+            'districts': len(data.get('districts') or []),
+            'schools': len(data.get('schools') or []),
+            'grades': len(data.get('grades') or []),
+            'curricula': len(data.get('curricula') or []),
+        }, flush=True)
+    except Exception:
+        pass
+    return data
+
+
+def _search_params(include_debug: bool = True) -> dict:
+    params = {
+        'date': (request.args.get('date') or '').strip(),
+        'district': (request.args.get('district') or '').strip(),
+        'school': (request.args.get('school') or '').strip(),
+        'grade': (request.args.get('grade') or '').strip(),
+    }
+    if include_debug:
+        params['debug'] = (request.args.get('debug') or '').strip()
+    return params
+
+
+def _meta_include_schools() -> bool:
+    # /meta?schools=0 leaves the school lists to /typeahead
+    return (request.args.get('schools') or '').strip().lower() not in ('0', 'false', 'no')
+
+
+def _typeahead_params() -> dict:
+    return {
+        'q': (request.args.get('q') or '').strip(),
+        'district': (request.args.get('district') or '').strip(),
+        'limit': (request.args.get('limit') or '').strip(),
+    }
+
+
+def _modules_response():
+    from api._shared import build_modules, stream_modules
+    curriculum = (request.args.get('curriculum') or '').strip()
+    grade = (request.args.get('grade') or '').strip()
+    if _wants_ndjson():
+        return stream_ndjson(stream_modules(curriculum, grade))
+    return json_cached('modules', (curriculum, grade), lambda: build_modules(curriculum, grade))
+
+
+BOOKS_PARAMS = ('title', 'url', 'date', 'from', 'to', 'district', 'grade')
+
+
+def _books_response():
+    from api._shared import build_books, stream_books
+    params = {k: (request.args.get(k) or '').strip() for k in BOOKS_PARAMS}
+    if _wants_ndjson():
+        return stream_ndjson(stream_books(params))
+    return json_cached('books', tuple(params[k] for k in BOOKS_PARAMS), lambda: build_books(params))
+
+
+KEYWORD_PARAMS = ('q', 'curriculum', 'grade', 'limit')
+
+
+def _keyword_response():
+    from api._shared import build_keyword_search
+    params = {k: (request.args.get(k) or '').strip() for k in KEYWORD_PARAMS}
+    return json_cached('module-search', tuple(params[k] for k in KEYWORD_PARAMS), lambda: build_keyword_search(params))
+
+
+CALENDAR_PARAMS = ('curriculum', 'school', 'district', 'grade', 'from', 'to')
+
+
+def _calendar_response():
+    from datetime import date
+    from api._shared import build_calendar
+    params = {k: (request.args.get(k) or '').strip() for k in CALENDAR_PARAMS}
+    # The default span starts today, so today is part of the cache key
+    key = tuple(params[k] for k in CALENDAR_PARAMS) + (date.today().isoformat(),)
+    return json_cached('calendar', key, lambda: build_calendar(params))
+
+
+def _active_report_response():
+    from datetime import date
+    from api._shared import ACTIVE_REPORT_COLUMNS, iter_active_modules
+    from api._stream import iter_csv, iter_json_object
+    raw_date = (request.args.get('date') or '').strip()
+    district = (request.args.get('district') or '').strip()
+    fmt = (request.args.get('format') or 'json').strip().lower()
+    try:
+        on = date.fromisoformat(raw_date) if raw_date else date.today()
+    except ValueError:
+        return json_utf8({'error': 'date must be YYYY-MM-DD', 'date': raw_date}, 400)
+    rows = iter_active_modules(on, district)
+    head = {'date': on.isoformat(), 'district': district or None}
+    if fmt == 'ndjson':
+        return stream_ndjson((head, rows))
+    if fmt == 'csv':
+        name = f'active-modules-{on.isoformat()}{"-d" + district if district else ""}.csv'
+        return stream_rows(iter_csv(rows, ACTIVE_REPORT_COLUMNS), 'text/csv; charset=utf-8', name)
+    if fmt != 'json':
+        return json_utf8({'error': 'format must be json, csv or ndjson', 'format': fmt}, 400)
+    return stream_rows(iter_json_object(head, 'rows', rows), 'application/json; charset=utf-8')
+
+
+def _token_denied():
+    """
+    Error response for an operator route (invalidate, warmup, debug) unless the request
+    carries INVALIDATE_TOKEN; None when it does. The routes 404 while the token is unset.
+    """
+    from api._shared import INVALIDATE_TOKEN, check_invalidate_token
+    if not INVALIDATE_TOKEN:
+        return json_utf8({'error': 'Not Found'}, 404)
+    auth = request.headers.get('Authorization', '')
+    presented = auth[7:].strip() if auth[:7].lower() == 'bearer ' else request.headers.get('X-Invalidate-Token', '').strip()
+    if not check_invalidate_token(presented):
+        return json_utf8({'error': 'Forbidden'}, 403)
+    return None
+
+
+def _invalidate_response():
+    from api._shared import invalidate
+    denied = _token_denied()
+    if denied is not None:
+        return denied
+    body = request.get_json(silent=True) or {}
+    names = body.get('sheets') if isinstance(body, dict) else None
+    names = names or request.args.getlist('sheet') or None
+    return json_utf8(invalidate(names))
+
+
+def _warmup_response():
+    from api._shared import warmup
+    denied = _token_denied()
+    if denied is not None:
+        return denied
+    return json_utf8(warmup())
+
+
+def _debug_response():
+    from api._shared import build_debug
+    # Exposes sheet headers, change sets and upstream errors: operator-only
+    denied = _token_denied()
+    if denied is not None:
+        return denied
+    return json_utf8(build_debug())
+
+
+def _memory_report_response():
+    from api._shared import build_memory_report
+    # Walks every loaded object graph: operator-only, like warmup
+    denied = _token_denied()
+    if denied is not None:
+        return denied
+    return json_utf8(build_memory_report())
+
+
+def _page_args(allowed_fields, max_limit: int):
+    """(fields, cursor, limit) from ?fields=a,b&cursor=...&limit=N; raises api._paging.PageError."""
+    from api._paging import parse_fields, parse_limit
+    fields = parse_fields(request.args.get('fields') or '', allowed_fields)
+    return fields, (request.args.get('cursor') or '').strip(), parse_limit(request.args.get('limit') or '', max_limit)
+
+
+def _page_key(fields, cursor: str, limit) -> tuple:
+    return (tuple(sorted(fields)) if fields is not None else None, cursor, limit)
+
+
+def _search_response(params: dict):
+    from api._paging import PageError, reject_paging
+    from api._shared import SEARCH_FIELDS, SEARCH_MAX_LIMIT, build_search, stream_search
+    params = dict(params, raw_fragments=True)
+    try:
+        fields, cursor, limit = _page_args(SEARCH_FIELDS, SEARCH_MAX_LIMIT)
+        if _wants_ndjson():
+            reject_paging(cursor, limit)
+            return stream_ndjson(stream_search(params, fields))
+        if str(params.get('debug') or '').lower() in ('1', 'true', 'yes'):
+            return json_utf8(build_search(params, fields, cursor, limit))
+        key = (params['date'], params['district'], params['school'], params['grade']) + _page_key(fields, cursor, limit)
+        return json_cached('search', key, lambda: build_search(params, fields, cursor, limit))
+    except PageError as e:
+        return json_utf8({'error': str(e)}, 400)
+
+
+def _meta_response(log_counts: bool = False):
+    from api._paging import PageError
+    from api._shared import META_FIELDS, META_MAX_LIMIT, build_meta
+    debug_flag = False
+    try:
+        debug_flag = str(request.args.get('debug', '')).lower() in ('1', 'true', 'yes')
+    except Exception:
+        debug_flag = False
+    include_schools = _meta_include_schools()
+    log = _log_meta_counts if log_counts else (lambda data: data)
+    try:
+        fields, cursor, limit = _page_args(META_FIELDS, META_MAX_LIMIT)
+        if debug_flag:
+            return json_utf8(log(build_meta(debug=True, include_schools=include_schools, fields=fields, cursor=cursor, limit=limit)))
+        key = (include_schools,) + _page_key(fields, cursor, limit)
+        return json_cached('meta', key, lambda: log(build_meta(
+            include_schools=include_schools, fields=fields, cursor=cursor, limit=limit)))
+    except PageError as e:
+        return json_utf8({'error': str(e)}, 400)
+
+
 @app.route('/health', methods=['GET', 'OPTIONS'])
 @app.route('/api/health', methods=['GET', 'OPTIONS'])
 def api_health():
@@ -25,27 +303,21 @@ def api_health():
     return json_utf8({'ok': True})
 
 
+@app.route('/warmup', methods=['GET', 'POST', 'OPTIONS'])
+@app.route('/api/warmup', methods=['GET', 'POST', 'OPTIONS'])
+def api_warmup():
+    """Target for platform warm pings: loads snapshots and indexes, reports step timings."""
+    if request.method == 'OPTIONS':
+        return json_utf8({'ok': True}, 204)
+    return _warmup_response()
+
+
 @app.route('/meta', methods=['GET', 'OPTIONS'])
 @app.route('/api/meta', methods=['GET', 'OPTIONS'])
 def api_meta():
     if request.method == 'OPTIONS':
         return json_utf8({'ok': True}, 204)
-    debug_flag = False
-    try:
-        debug_flag = str(request.args.get('debug', '')).lower() in ('1', 'true', 'yes')
-    except Exception:
-        debug_flag = False
-    data = build_meta(debug=debug_flag)
-    try:
-        print('[api_meta] returning counts', {
-            'districts': len(data.get('districts') or []),
-            'schools': len(data.get('schools') or []),
-            'grades': len(data.get('grades') or []),
-            'curricula': len(data.get('curricula') or []),
-        }, flush=True)
-    except Exception:
-        pass
-    return json_utf8(data)
+    return _meta_response(log_counts=True)
 
 
 @app.route('/modules', methods=['GET', 'OPTIONS'])
@@ -53,10 +325,7 @@ def api_meta():
 def api_modules():
     if request.method == 'OPTIONS':
         return json_utf8({'ok': True}, 204)
-    curriculum = (request.args.get('curriculum') or '').strip()
-    grade = (request.args.get('grade') or '').strip()
-    data = build_modules(curriculum, grade)
-    return json_utf8(data)
+    return _modules_response()
 
 
 @app.route('/search', methods=['GET', 'OPTIONS'])
@@ -64,26 +333,79 @@ def api_modules():
 def api_search():
     if request.method == 'OPTIONS':
         return json_utf8({'ok': True}, 204)
-    params = {
-        'date': (request.args.get('date') or '').strip(),
-        'district': (request.args.get('district') or '').strip(),
-        'school': (request.args.get('school') or '').strip(),
-        'grade': (request.args.get('grade') or '').strip(),
-        'debug': (request.args.get('debug') or '').strip(),
-    }
-    data = build_search(params)
-    return json_utf8(data)
+    return _search_response(_search_params())
+
+@app.route('/typeahead', methods=['GET', 'OPTIONS'])
+@app.route('/api/typeahead', methods=['GET', 'OPTIONS'])
+def api_typeahead():
+    if request.method == 'OPTIONS':
+        return json_utf8({'ok': True}, 204)
+    from api._shared import build_typeahead
+    # Per-keystroke queries are cheap and rarely repeat; keep them out of the body cache
+    return json_utf8(build_typeahead(_typeahead_params()))
+
+@app.route('/books', methods=['GET', 'OPTIONS'])
+@app.route('/api/books', methods=['GET', 'OPTIONS'])
+def api_books():
+    if request.method == 'OPTIONS':
+        return json_utf8({'ok': True}, 204)
+    return _books_response()
+
+@app.route('/module-search', methods=['GET', 'OPTIONS'])
+@app.route('/api/module-search', methods=['GET', 'OPTIONS'])
+def api_module_search():
+    if request.method == 'OPTIONS':
+        return json_utf8({'ok': True}, 204)
+    return _keyword_response()
+
+@app.route('/calendar', methods=['GET', 'OPTIONS'])
+@app.route('/api/calendar', methods=['GET', 'OPTIONS'])
+def api_calendar():
+    if request.method == 'OPTIONS':
+        return json_utf8({'ok': True}, 204)
+    return _calendar_response()
+
+@app.route('/report/active', methods=['GET', 'OPTIONS'])
+@app.route('/api/report/active', methods=['GET', 'OPTIONS'])
+def api_report_active():
+    """Active module for every school and grade in a district (or citywide) on ?date=."""
+    if request.method == 'OPTIONS':
+        return json_utf8({'ok': True}, 204)
+    return _active_report_response()
+
+@app.route('/debug', methods=['GET', 'OPTIONS'])
+@app.route('/api/debug', methods=['GET', 'OPTIONS'])
+def api_debug():
+    if request.method == 'OPTIONS':
+        return json_utf8({'ok': True}, 204)
+    return _debug_response()
+
+@app.route('/invalidate', methods=['POST', 'OPTIONS'])
+@app.route('/api/invalidate', methods=['POST', 'OPTIONS'])
+def api_invalidate():
+    """Push hook for sheet edits: refetch now instead of after SNAPSHOT_TTL_SECONDS."""
+    if request.method == 'OPTIONS':
+        return json_utf8({'ok': True}, 204)
+    return _invalidate_response()
+
+@app.route('/debug/memory', methods=['GET', 'OPTIONS'])
+@app.route('/api/debug/memory', methods=['GET', 'OPTIONS'])
+def api_debug_memory():
+    if request.method == 'OPTIONS':
+        return json_utf8({'ok': True}, 204)
+    return _memory_report_response()
+
 
 @app.route('/school-grades', methods=['GET', 'OPTIONS'])
 @app.route('/api/school-grades', methods=['GET', 'OPTIONS'])
 def api_school_grades():
     if request.method == 'OPTIONS':
         return json_utf8({'ok': True}, 204)
-    data = build_school_grades()
-    return json_utf8(data)
+    from api._shared import build_school_grades
+    return json_cached('school-grades', (), build_school_grades)
 
-@app.route('/api/index.py', methods=['GET', 'OPTIONS'])
-@app.route('/api/index', methods=['GET', 'OPTIONS'])
+@app.route('/api/index.py', methods=['GET', 'POST', 'OPTIONS'])
+@app.route('/api/index', methods=['GET', 'POST', 'OPTIONS'])
 def api_dispatch_rewrite():
     """
     Dispatcher for Vercel rewrite that forwards original path via ?__path=/api/xxx
@@ -102,24 +424,39 @@ def api_dispatch_rewrite():
     tail = tail.strip('/')
     if tail == 'health':
         return json_utf8({'ok': True})
+    if tail == 'invalidate':
+        if request.method != 'POST':
+            return json_utf8({'error': 'Method Not Allowed'}, 405)
+        return _invalidate_response()
+    if request.method == 'POST' and tail != 'warmup':
+        return json_utf8({'error': 'Method Not Allowed'}, 405)
+    if tail == 'warmup':
+        return _warmup_response()
+    from api._shared import build_typeahead
     if tail == 'meta':
-        debug_flag = False
-        try:
-            debug_flag = str(request.args.get('debug', '')).lower() in ('1', 'true', 'yes')
-        except Exception:
-            debug_flag = False
-        return json_utf8(build_meta(debug=debug_flag))
+        return _meta_response()
+    if tail == 'typeahead':
+        return json_utf8(build_typeahead(_typeahead_params()))
+    if tail == 'books':
+        return _books_response()
+    if tail == 'module-search':
+        return _keyword_response()
+    if tail == 'report/active':
+        return _active_report_response()
+    if tail == 'calendar':
+        return _calendar_response()
+    if tail == 'debug':
+        return _debug_response()
+    if tail == 'debug/memory':
+        return _memory_report_response()
     if tail == 'modules':
-        curriculum = (request.args.get('curriculum') or '').strip()
-        grade = (request.args.get('grade') or '').strip()
-        return json_utf8(build_modules(curriculum, grade))
+        return _modules_response()
     if tail == 'search':
-        params = {
-            'date': (request.args.get('date') or '').strip(),
-            'district': (request.args.get('district') or '').strip(),
-            'school': (request.args.get('school') or '').strip(),
-            'grade': (request.args.get('grade') or '').strip(),
-        }
-        return json_utf8(build_search(params))
+        return _search_response(_search_params(include_debug=False))
     return json_utf8({'error': 'Not Found', 'path': orig}, 404)
 
+
+# Opt-in: pay the fetch/parse/index cost at worker start instead of on the first request
+if os.environ.get('WARMUP_ON_START', '').strip().lower() in ('1', 'true', 'yes'):
+    from api._shared import warmup as _warmup
+    logging.getLogger("api").info("[warmup] %s", _warmup())
@@ -0,0 +1,95 @@
+"""
+Deterministic synthetic sheets shaped like the real Google Sheets exports.
+
+Benchmarks and the load-test harness use these instead of live data:
+  make_sheets(...)       -> (schools_csv_text, pacing_csv_text)
+  use_synthetic(...)     writes both CSVs to a temp dir and points the API at
+                         them through DATA_SOURCE=local (call before importing api._shared)
+"""
+import csv
+import io
+import os
+import random
+import tempfile
+
+CURRICULA = ['HMH Into Reading', 'EL Education', 'Wit & Wisdom']
+GRADES = ['K'] + [str(g) for g in range(1, 9)]
+GRADE_BANDS = ['K-5', 'PK-5', '6-8', 'K-8', 'PK-8', '9-12', 'High Schools (9-12) & Combined', 'K,1,2,3']
+WORDS = [
+    'revolution', 'community', 'animals', 'space', 'heroes', 'water', 'family', 'journeys',
+    'identity', 'weather', 'plants', 'music', 'courage', 'inventions', 'oceans', 'freedom',
+]
+BOOKS = [
+    'Chains', 'The Name Jar', 'Those Shoes', 'Each Kindness', 'Venom', 'Wonder', 'Hatchet',
+    'Esperanza Rising', 'Number the Stars', 'Bud, Not Buddy', 'Galápagos George', 'Me...Jane',
+]
+MODULE_WINDOWS = ['9/4-10/24', '10/27-12/19', '1/5-3/13', '3/16-5/8', '5/11-6/26']
+READING_SLOTS = 6
+
+
+def make_sheets(n_schools: int = 1800, curricula_scale: int = 1, seed: int = 7) -> tuple[str, str]:
+    """
+    School Directories with n_schools rows (about 2% duplicated per school, like the
+    real sheet), and a Pacing Guide with 4-5 modules per curriculum x grade.
+    curricula_scale > 1 adds synthetic curricula to grow the pacing sheet.
+    """
+    rnd = random.Random(seed)
+    curricula = list(CURRICULA)
+    for i in range(1, curricula_scale):
+        curricula += [f'{c} v{i}' for c in CURRICULA]
+
+    out = io.StringIO()
+    w = csv.writer(out)
+    w.writerow(['District #', 'School Name', 'Curriculum', 'Grade'])
+    for i in range(n_schools):
+        district = str(rnd.randint(1, 32))
+        prefix = rnd.choice(['P.S.', 'I.S.', 'M.S.', 'J.H.S.'])
+        name = f'{prefix} {i:03d} {rnd.choice(WORDS).title()} {rnd.choice(["Academy", "School", "Elementary", "Prep"])}'
+        curriculum = rnd.choice(curricula)
+        w.writerow([district, name, curriculum, rnd.choice(GRADE_BANDS)])
+        if rnd.random() < 0.02:
+            w.writerow([district, name, curriculum, rnd.choice(GRADE_BANDS)])
+    schools = out.getvalue()
+
+    out = io.StringIO()
+    w = csv.writer(out)
+    header = ['Curriculum', 'Grade Level', 'Module', 'Theme', 'Date Range', 'Essential Questions', 'Text Genres']
+    for k in range(1, READING_SLOTS + 1):
+        header += [f'Reading List {k}', f'Reading URL {k}', f'CoverImageURL {k}']
+    w.writerow(header)
+    for curriculum in curricula:
+        for grade in GRADES:
+            n_modules = 4 if curriculum.startswith('EL') else 5
+            for m in range(1, n_modules + 1):
+                topic = rnd.choice(WORDS)
+                row = [
+                    curriculum, grade, str(m), f'{topic.title()} and {rnd.choice(WORDS).title()}',
+                    MODULE_WINDOWS[m - 1],
+                    f'How does {topic} shape us? Why does {rnd.choice(WORDS)} matter?',
+                    '\n'.join(rnd.sample(['Fiction', 'Poetry', 'Informational', 'Biography', 'Drama'], 2)),
+                ]
+                for k in range(1, READING_SLOTS + 1):
+                    if k > 2 and rnd.random() < 0.4:
+                        row += ['', '', '']
+                        continue
+                    title = rnd.choice(BOOKS)
+                    row += [title, f'https://books.example/{k}/{m}', f'https://covers.example/{title[:4]}.jpg']
+                w.writerow(row)
+    return schools, out.getvalue()
+
+
+def write_sheets(directory: str, **kwargs) -> str:
+    schools, pacing = make_sheets(**kwargs)
+    with open(os.path.join(directory, 'schools.csv'), 'w', encoding='utf-8') as f:
+        f.write(schools)
+    with open(os.path.join(directory, 'pacing.csv'), 'w', encoding='utf-8') as f:
+        f.write(pacing)
+    return directory
+
+
+def use_synthetic(**kwargs) -> str:
+    """Point the API at freshly written synthetic CSVs; must run before api._shared is imported."""
+    directory = write_sheets(tempfile.mkdtemp(prefix='nycreads-bench-'), **kwargs)
+    os.environ['DATA_SOURCE'] = 'local'
+    os.environ['DATA_PATH'] = directory
+    return directory
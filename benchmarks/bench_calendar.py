@@ -0,0 +1,83 @@
+"""
+Batch date resolution vs the per-row _resolve_range loop.
+
+Matches every day of a year against every searchable pacing module from
+synthetic sheets and times:
+  loop     for each date, for each module: _resolve_range + compare
+  bisect   api._calendar without numpy (sorted date keys, two bisects per module)
+  numpy    api._calendar with numpy (skipped when not installed)
+Every variant's result is checked against the loop's.
+
+Usage:
+  python benchmarks/bench_calendar.py [--days 365] [--curricula-scale 4] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _synthetic import use_synthetic  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--days', type=int, default=365)
+    ap.add_argument('--curricula-scale', type=int, default=4)
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args()
+
+    use_synthetic(n_schools=200, curricula_scale=args.curricula_scale)
+    from api import _calendar
+    from api._shared import _calendar_index, _pacing_index, _resolve_range
+
+    records = _pacing_index()['searchable']
+    calendar = _calendar_index()
+    dates = [date(2025, 7, 1) + timedelta(days=i) for i in range(args.days)]
+
+    def loop():
+        out = []
+        for ref in dates:
+            ids = []
+            for module_id, rec in enumerate(records):
+                try:
+                    s, e = _resolve_range(rec['start_md'], rec['end_md'], ref)
+                except Exception:
+                    continue
+                if s <= ref <= e:
+                    ids.append(module_id)
+            out.append(ids)
+        return out
+
+    def batch(use_numpy):
+        def run():
+            _calendar.USE_NUMPY = use_numpy
+            _calendar._numpy_mod = None
+            return calendar.active(dates)
+        return run
+
+    variants = [('loop', loop), ('bisect', batch(False))]
+    try:
+        import numpy  # noqa: F401
+        variants.append(('numpy', batch(True)))
+    except ImportError:
+        print('numpy not installed; skipping')
+
+    print(f'{len(dates)} dates x {len(records)} modules')
+    expected = loop()
+    for name, fn in variants:
+        best = float('inf')
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            got = fn()
+            best = min(best, time.perf_counter() - t0)
+        status = 'ok' if got == expected else 'MISMATCH'
+        print(f'{name:<8} {best * 1000:>9.2f} ms  {status}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Memory and lookup cost of interning repeated cell values (api/_intern.py).
+
+Parses synthetic School Directories and Pacing Guide CSVs and builds the school
+and pacing indexes twice, with INTERN_CELLS off and on, and reports:
+  memory     bytes still allocated for rows + indexes (tracemalloc), and per row
+  strings    str cells held vs distinct str objects vs distinct values
+  lookup     school-name and curriculum index lookups, plus the district
+             equality filter /search applies, with the query normalized the
+             same way as in the API
+
+Usage:
+  python benchmarks/bench_intern.py [--schools 1800] [--curricula-scale 4] [--repeat 200000]
+"""
+import argparse
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _synthetic import make_sheets  # noqa: E402
+
+
+def load(schools_csv: str, pacing_csv: str):
+    from api._shared import _csv_from_text, _index_pacing, _index_schools
+    schools = _csv_from_text(schools_csv)
+    pacing = _csv_from_text(pacing_csv)
+    return schools, pacing, _index_schools(schools), _index_pacing(pacing)
+
+
+def string_stats(rows: list) -> tuple[int, int, int]:
+    cells = [v for r in rows for v in r.values() if isinstance(v, str) and v]
+    return len(cells), len({id(v) for v in cells}), len(set(cells))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--schools', type=int, default=1800)
+    ap.add_argument('--curricula-scale', type=int, default=4)
+    ap.add_argument('--repeat', type=int, default=200000)
+    args = ap.parse_args()
+
+    schools_csv, pacing_csv = make_sheets(n_schools=args.schools, curricula_scale=args.curricula_scale)
+    from api import _intern
+    from api._shared import _normalize_curriculum_text, _normalize_lookup_text
+
+    results = {}
+    # Off first: interned strings from the "on" pass would otherwise already exist
+    for mode in (False, True):
+        _intern.INTERN_CELLS = mode
+        gc.collect()
+        tracemalloc.start()
+        data = load(schools_csv, pacing_csv)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        schools, pacing, school_index, pacing_index = data
+        n_rows = len(schools) + len(pacing)
+
+        # Queries arrive as fresh strings and go through the API's normalizers
+        entry = next(iter(school_index['by_name'].values()))[0]
+        name_q = ''.join(list(entry['school']))
+        district_q = ''.join(list(entry['district']))
+        curriculum_q = ''.join(list(pacing_index['searchable'][0]['curriculum']))
+        entries = [e for group in school_index['by_name'].values() for e in group]
+
+        def lookups():
+            school_index['by_name'].get(_normalize_lookup_text(name_q))
+            pacing_index['by_curriculum'].get(_normalize_curriculum_text(curriculum_q))
+
+        district_norm = _normalize_lookup_text(district_q)
+
+        def district_filter():
+            return [e for e in entries if e['district_norm'] == district_norm]
+
+        results[mode] = {
+            'bytes': size,
+            'rows': n_rows,
+            'strings': [string_stats(schools), string_stats(pacing)],
+            'lookup_ns': min(timeit.repeat(lookups, number=args.repeat, repeat=3)) / args.repeat * 1e9,
+            'filter_us': min(timeit.repeat(district_filter, number=200, repeat=3)) / 200 * 1e6,
+        }
+        del data, schools, pacing, school_index, pacing_index, entries
+
+    print(f'{args.schools} schools, curricula scale {args.curricula_scale}')
+    for mode, r in results.items():
+        label = 'interned' if mode else 'plain'
+        (sc, so, sv), (pc, po, pv) = r['strings']
+        print(f'{label:<9} {r["bytes"] / 1024:>9.1f} KiB  {r["bytes"] / r["rows"]:>7.1f} B/row  '
+              f'schools {sc} cells / {so} objects / {sv} values  '
+              f'pacing {pc} / {po} / {pv}  '
+              f'lookup {r["lookup_ns"]:.0f} ns  district filter {r["filter_us"]:.1f} us')
+    saved = results[False]['bytes'] - results[True]['bytes']
+    print(f'saved     {saved / 1024:.1f} KiB ({saved / results[False]["bytes"]:.0%})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare JSON encoders on real response shapes.
+
+Builds /meta, an undated school+grade /search, a grade-wide /search and a
+/modules payload from synthetic sheets, then times:
+  flask-like   json.dumps(sort_keys=True) with ASCII escaping (what jsonify did)
+  stdlib       api._json with the stdlib backend
+  orjson       api._json with orjson (skipped when not installed)
+and each backend again with pre-serialized book fragments spliced in.
+
+Usage:
+  python benchmarks/bench_json.py [--schools 1800] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _synthetic import use_synthetic  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--schools', type=int, default=1800)
+    ap.add_argument('--repeat', type=int, default=200)
+    args = ap.parse_args()
+
+    use_synthetic(n_schools=args.schools)
+    from api import _json
+    from api._shared import build_meta, build_modules, build_search, warmup
+
+    warmup()
+    meta = build_meta()
+    school = meta['schools'][0]
+    grade = '3'
+    shapes = {
+        'meta': (lambda: meta, None),
+        'search school+grade': (
+            lambda: build_search({'school': school['school'], 'district': school['district'], 'grade': grade}),
+            lambda: build_search({'school': school['school'], 'district': school['district'], 'grade': grade, 'raw_fragments': True}),
+        ),
+        'search grade-wide': (
+            lambda: build_search({'grade': grade}),
+            lambda: build_search({'grade': grade, 'raw_fragments': True}),
+        ),
+        'modules': (lambda: build_modules('EL Education', grade), None),
+    }
+
+    backends = ['stdlib']
+    try:
+        import orjson  # noqa: F401
+        backends.append('orjson')
+    except ImportError:
+        print('orjson not installed; skipping')
+
+    def bench(fn) -> float:
+        return min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat * 1e6
+
+    print(f"{'shape':<22} {'bytes':>8} {'encoder':<22} {'us/op':>10}")
+    for name, (plain, fragmented) in shapes.items():
+        data = plain()
+        frag_data = fragmented() if fragmented is not None else None
+        size = len(_json.dumps(data))
+        timings = [('flask-like', bench(lambda: json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')))]
+        for backend in backends:
+            # Switch the backend api._json resolves on its next call
+            _json.JSON_ENCODER = backend
+            _json._orjson_mod = None
+            timings.append((backend, bench(lambda: _json.dumps(data))))
+            if frag_data is not None:
+                timings.append((f'{backend}+fragments', bench(lambda: _json.dumps(frag_data))))
+        for label, us in timings:
+            print(f'{name:<22} {size:>8} {label:<22} {us:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Cold-start benchmark for the serverless entry point.
+
+Each measurement runs in a fresh interpreter so nothing is already imported:
+  - per-module import time (from `python -X importtime`) for the API modules
+  - wall time to import api.index and serve one /health request
+  - which heavy modules /health ended up importing
+
+Usage:
+  python benchmarks/bench_startup.py [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = ['api._engine', 'api._shared', 'api.index']
+HEAVY = ['api._shared', 'requests', 'pandas', 'numpy']
+
+HEALTH_PROBE = r'''
+import sys, time
+t0 = time.perf_counter()
+from api.index import app
+t1 = time.perf_counter()
+app.test_client().get('/health')
+t2 = time.perf_counter()
+print('%f %f %s' % (t1 - t0, t2 - t1, ','.join(m for m in sys.argv[1:] if m in sys.modules)))
+'''
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def import_times(target: str) -> dict[str, tuple[int, int]]:
+    """Map module -> (self_us, cumulative_us) for one fresh `import target`."""
+    proc = _run(['-X', 'importtime', '-c', f'import {target}' if target else 'pass'])
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cum_us, name = line[len('import time:'):].split('|')
+        out[name.strip()] = (int(self_us), int(cum_us))
+    return out
+
+
+def health_probe() -> tuple[float, float, list[str]]:
+    proc = _run(['-c', HEALTH_PROBE, *HEAVY])
+    imp, req, loaded = (proc.stdout.strip() + ' ').split(' ', 2)
+    return float(imp), float(req), [m for m in loaded.strip().split(',') if m]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--runs', type=int, default=5)
+    ap.add_argument('--top', type=int, default=15)
+    args = ap.parse_args()
+
+    # Modules the interpreter imports before our code runs (site, .pth hooks)
+    startup = set(import_times(''))
+    for target in TARGETS:
+        samples = [import_times(target) for _ in range(args.runs)]
+        totals = [s.get(target, (0, 0))[1] for s in samples]
+        print(f'\n== import {target}: median {statistics.median(totals) / 1000:.1f} ms cumulative')
+        last = {k: v for k, v in samples[-1].items() if k not in startup}
+        heaviest = sorted(last.items(), key=lambda kv: kv[1][1], reverse=True)[: args.top]
+        print(f"{'module':<40} {'self ms':>9} {'cum ms':>9}")
+        for name, (self_us, cum_us) in heaviest:
+            print(f'{name:<40} {self_us / 1000:>9.1f} {cum_us / 1000:>9.1f}')
+
+    probes = [health_probe() for _ in range(args.runs)]
+    print('\n== cold /health')
+    print(f'import api.index  median {statistics.median(p[0] for p in probes) * 1000:.1f} ms')
+    print(f'first /health     median {statistics.median(p[1] for p in probes) * 1000:.1f} ms')
+    print(f'heavy modules loaded: {probes[-1][2] or "none"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+"""
+Tests run against the synthetic sheets in benchmarks/_synthetic.py, never the
+live Google Sheets: the data source is chosen when api._shared is imported, so
+it is set here before any test module imports the app.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from _synthetic import use_synthetic  # noqa: E402
+
+use_synthetic(n_schools=120)
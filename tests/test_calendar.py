@@ -0,0 +1,61 @@
+"""ModuleCalendar agrees with _resolve_range, including windows that wrap the new year."""
+from datetime import date, timedelta
+
+import pytest
+
+from api import _calendar
+from api._calendar import ModuleCalendar
+from api._shared import _md_to_date, _resolve_range
+
+BOUNDS = [
+    ('9/4', '10/24'),    # plain
+    ('11/3', '1/16'),    # wraps the new year
+    ('12/31', '1/1'),    # wraps, two days
+    ('1/1', '12/31'),    # whole year
+    ('2/29', '3/10'),    # leap-day bound: checked per date
+    ('2/20', '2/29'),
+    ('5/11', '5/11'),    # one day
+    ('', '6/26'),        # unparseable: never active
+    ('Oct 1', 'Nov 1'),  # month-name form
+]
+
+
+def _expected(ref: date) -> list[int]:
+    out = []
+    for i, (start_md, end_md) in enumerate(BOUNDS):
+        try:
+            s, e = _resolve_range(start_md, end_md, ref)
+        except ValueError:
+            continue
+        if s <= ref <= e:
+            out.append(i)
+    return out
+
+
+@pytest.fixture(params=['bisect', 'numpy'])
+def calendar(request, monkeypatch):
+    if request.param == 'bisect':
+        monkeypatch.setattr(_calendar, 'USE_NUMPY', False)
+    elif _calendar._numpy() is None:
+        pytest.skip('numpy not installed')
+    return ModuleCalendar(BOUNDS, _md_to_date, _resolve_range)
+
+
+@pytest.mark.parametrize('year', [2024, 2025])
+def test_every_day_matches_resolver(calendar, year):
+    dates = [date(year, 1, 1) + timedelta(days=i) for i in range(366 if year == 2024 else 365)]
+    assert calendar.active(dates) == [_expected(d) for d in dates]
+
+
+def test_wrapping_window(calendar):
+    dec, jan, summer = date(2025, 12, 15), date(2026, 1, 10), date(2025, 7, 1)
+    active = calendar.active([dec, jan, summer])
+    assert 1 in active[0] and 1 in active[1] and 1 not in active[2]
+    assert calendar.window(1, jan) == (date(2025, 11, 3), date(2026, 1, 16))
+    assert calendar.window(1, dec) == (date(2025, 11, 3), date(2026, 1, 16))
+
+
+def test_unsorted_dates_keep_their_order(calendar):
+    dates = [date(2025, 10, 1), date(2025, 1, 5), date(2025, 12, 31)]
+    assert calendar.active(dates) == [_expected(d) for d in dates]
+    assert calendar.active([]) == []
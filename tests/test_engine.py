@@ -0,0 +1,97 @@
+"""Snapshot publishing and per-row result reuse across refreshes."""
+import pytest
+
+from api._engine import DataEngine, diff_rows, row_hash
+
+ROWS = [{'School': f'P.S. {i}', 'District': str(i % 3)} for i in range(6)]
+
+
+class Sheet:
+    """A loader whose rows the test edits between refreshes."""
+
+    def __init__(self, rows):
+        self.rows = [dict(r) for r in rows]
+        self.calls = 0
+        self.error = None
+
+    def __call__(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return [dict(r) for r in self.rows]
+
+
+@pytest.fixture
+def sheet():
+    return Sheet(ROWS)
+
+
+@pytest.fixture
+def engine(sheet):
+    return DataEngine({'schools': sheet}, ttl=0)
+
+
+def test_row_hash_is_content_based():
+    assert row_hash({'a': '1'}) == row_hash(dict([('a', '1')]))
+    assert row_hash({'a': '1'}) != row_hash({'a': '2'})
+    assert row_hash({'a': '1', 'b': ''}) != row_hash({'a': '1b', '': ''})
+
+
+def test_unchanged_rows_reuse_results(engine, sheet):
+    built = []
+
+    def normalize(row):
+        built.append(row['School'])
+        return row['School'].lower()
+
+    first = engine.snapshot('schools')
+    assert first.map_rows('norm', normalize) == [r['School'].lower() for r in ROWS]
+    assert first.row_stats['norm'] == {'reused': 0, 'built': 6}
+
+    sheet.rows[2]['School'] = 'P.S. 99'
+    sheet.rows.append({'School': 'P.S. 100', 'District': '1'})
+    built.clear()
+    second = engine.snapshot('schools')
+    assert second.version == 2
+    assert second.map_rows('norm', normalize)[2] == 'p.s. 99'
+    assert sorted(built) == ['P.S. 100', 'P.S. 99']
+    assert second.row_stats['norm'] == {'reused': 5, 'built': 2}
+    assert second.changes['added'] == 2 and second.changes['removed'] == 1
+    assert second.changes['changed_row_indexes'] == [2, 6]
+
+
+def test_same_content_keeps_snapshot(engine, sheet):
+    first = engine.snapshot('schools')
+    index = first.derived('by_school', lambda rows: {r['School']: r for r in rows})
+    again = engine.snapshot('schools')
+    assert again is first and again.version == 1
+    assert again.derived('by_school', lambda rows: 1 / 0) is index
+    assert engine.generation == 1
+
+
+def test_reorder_is_a_new_version_with_full_reuse(engine, sheet):
+    first = engine.snapshot('schools')
+    first.map_rows('norm', lambda r: r['School'])
+    sheet.rows.reverse()
+    second = engine.snapshot('schools')
+    assert second.version == 2 and second.changes['reordered']
+    second.map_rows('norm', lambda r: r['School'])
+    assert second.row_stats['norm'] == {'reused': 6, 'built': 0}
+
+
+def test_failed_refresh_serves_previous(engine, sheet):
+    first = engine.snapshot('schools')
+    sheet.error = RuntimeError('upstream down')
+    assert engine.snapshot('schools') is first
+    cold = DataEngine({'schools': sheet}, ttl=0)
+    with pytest.raises(RuntimeError):
+        cold.snapshot('schools')
+
+
+def test_diff_rows_counts_duplicates():
+    a, b = b'a', b'b'
+    changes = diff_rows([a, a, b], [a, b, b])
+    assert (changes['added'], changes['removed'], changes['unchanged']) == (1, 1, 2)
+    # Duplicates are interchangeable: the first row with an added hash is reported
+    assert changes['changed_row_indexes'] == [1]
+    assert not changes['reordered']
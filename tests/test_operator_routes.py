@@ -0,0 +1,27 @@
+"""Operator routes answer only to INVALIDATE_TOKEN, on every path that reaches them."""
+import pytest
+
+import api._shared
+from api.index import app
+
+PATHS = ['/debug', '/api/debug', '/api/index?__path=debug', '/debug/memory', '/warmup']
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_not_found_while_token_unset(client, monkeypatch, path):
+    monkeypatch.setattr(api._shared, 'INVALIDATE_TOKEN', '')
+    assert client.get(path).status_code == 404
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_token_required(client, monkeypatch, path):
+    monkeypatch.setattr(api._shared, 'INVALIDATE_TOKEN', 'secret')
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    assert client.get(path, headers={'Authorization': 'Bearer secret'}).status_code == 200
+    assert client.get(path, headers={'X-Invalidate-Token': 'secret'}).status_code == 200
@@ -0,0 +1,71 @@
+"""Cursor pagination: the cursor format itself and how /meta pages its school list."""
+import pytest
+
+from api.index import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_meta_pages_schools(client):
+    full = client.get('/meta').get_json()
+    first = client.get('/meta', query_string={'fields': 'schools,districtBySchool', 'limit': 5}).get_json()
+    assert first['schools'] == full['schools'][:5]
+    assert set(first['districtBySchool']) == {s['school'] for s in first['schools']}
+    second = client.get('/meta', query_string={'fields': 'schools', 'limit': 5, 'cursor': first['next_cursor']}).get_json()
+    assert second['schools'] == full['schools'][5:10]
+
+
+def test_meta_last_page_has_no_cursor(client):
+    n = len(client.get('/meta').get_json()['schools'])
+    body = client.get('/meta', query_string={'fields': 'schools', 'limit': n}).get_json()
+    assert len(body['schools']) == n
+    assert 'next_cursor' not in body
+
+
+@pytest.mark.parametrize('query', [
+    {'fields': 'districts', 'limit': 2},
+    {'fields': 'districts,grades', 'cursor': 'MC4w'},
+    {'schools': '0', 'limit': 2},
+])
+def test_meta_without_schools_cannot_be_paged(client, query):
+    resp = client.get('/meta', query_string=query)
+    assert resp.status_code == 400
+    assert 'next_cursor' not in resp.get_json()
+
+
+def test_meta_fields_without_paging(client):
+    body = client.get('/meta', query_string={'fields': 'districts'}).get_json()
+    assert set(body) == {'districts'}
+
+
+def test_cursor_round_trip():
+    from api._paging import decode_cursor, encode_cursor
+    cursor = encode_cursor(250, 'v1')
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 'v1') == 250
+    assert decode_cursor('', 'v1') == 0
+
+
+def test_cursor_from_other_data_is_stale():
+    from api._paging import PageError, decode_cursor, encode_cursor
+    with pytest.raises(PageError, match='stale'):
+        decode_cursor(encode_cursor(10, 'v1'), 'v2')
+
+
+@pytest.mark.parametrize('cursor', ['%%%', 'bm90LWEtY3Vyc29y', 'LTEuYWJj'])
+def test_malformed_cursor(cursor):
+    from api._paging import PageError, decode_cursor
+    with pytest.raises(PageError, match='malformed'):
+        decode_cursor(cursor, 'v1')
+
+
+def test_parse_limit_clamps():
+    from api._paging import PageError, parse_limit
+    assert parse_limit('', 100) is None
+    assert parse_limit('0', 100) == 1
+    assert parse_limit('1000', 100) == 100
+    with pytest.raises(PageError):
+        parse_limit('ten', 100)
@@ -0,0 +1,36 @@
+"""/api/report/active behaves the same on the Vercel app and the local server."""
+import pytest
+
+from api.index import app as vercel_app
+from server import app as local_app
+
+CLIENTS = [
+    pytest.param(vercel_app, '/report/active', id='vercel'),
+    pytest.param(local_app, '/api/report/active', id='server'),
+]
+
+
+@pytest.mark.parametrize('app,path', CLIENTS)
+def test_unknown_format_is_400(app, path):
+    resp = app.test_client().get(path, query_string={'date': '2025-10-01', 'format': 'xml'})
+    assert resp.status_code == 400
+    assert resp.get_json()['format'] == 'xml'
+
+
+@pytest.mark.parametrize('app,path', CLIENTS)
+def test_csv_is_an_attachment(app, path):
+    resp = app.test_client().get(path, query_string={'date': '2025-10-01', 'format': 'csv'})
+    body = resp.data
+    assert resp.status_code == 200
+    assert resp.mimetype == 'text/csv'
+    assert resp.headers['Content-Disposition'] == 'attachment; filename="active-modules-2025-10-01.csv"'
+    assert body.splitlines()[0].startswith(b'district,')
+
+
+@pytest.mark.parametrize('app,path', CLIENTS)
+def test_json_and_bad_date(app, path):
+    client = app.test_client()
+    body = client.get(path, query_string={'date': '2025-10-01'}).get_json()
+    assert body['date'] == '2025-10-01'
+    assert body['rows']
+    assert client.get(path, query_string={'date': '10/01/2025'}).status_code == 400
@@ -0,0 +1,94 @@
+"""The shared snapshot file: its format, version polling, and what a refresh rewrites."""
+import pytest
+
+from api._engine import DataEngine
+from api._snapfile import MappedSnapshot, SharedSnapshotStore, read_header, write_snapshot
+
+SCHOOLS = [
+    {'District': '2', 'School Name': 'P.S. 015 Roberto Clemente', 'Curriculum': 'EL Education'},
+    {'District': '2', 'School Name': 'Café School', 'Curriculum': ''},
+    {'District': '31', 'School Name': 'P.S. 015 Roberto Clemente', 'Curriculum': 'Wit & Wisdom'},
+]
+PACING = [{'Curriculum': 'EL Education', 'Grade': '3', 'Module': '1'}]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'nycreads.snap')
+
+
+def test_round_trip(path):
+    write_snapshot(path, {'schools': SCHOOLS, 'pacing': PACING, 'empty': []}, version=7)
+    snap = MappedSnapshot(path)
+    assert snap.version == 7
+    assert [dict(r) for r in snap.tables['schools']] == SCHOOLS
+    assert [dict(r) for r in snap.tables['pacing']] == PACING
+    assert len(snap.tables['empty']) == 0
+    row = snap.tables['schools'][-1]
+    assert row['District'] == '31' and row.get('Missing', 'x') == 'x'
+    assert [dict(r) for r in snap.tables['schools'][1:]] == SCHOOLS[1:]
+    with pytest.raises(IndexError):
+        snap.tables['schools'][3]
+
+
+def test_header(path, tmp_path):
+    assert read_header(path) is None
+    write_snapshot(path, {'schools': SCHOOLS}, version=3)
+    version, created_at, digest = read_header(path)
+    assert version == 3 and created_at > 0 and len(digest) == 16
+    junk = tmp_path / 'junk.snap'
+    junk.write_bytes(b'not a snapshot file at all, just some bytes....')
+    assert read_header(str(junk)) is None
+
+
+def _store(path, data, ttl=0.0):
+    return SharedSnapshotStore(path, {name: (lambda name=name: data[name]) for name in data}, ttl=ttl)
+
+
+def test_versions_move_only_with_content(path):
+    data = {'schools': list(SCHOOLS), 'pacing': list(PACING)}
+    store = _store(path, data)
+    first = store.current()
+    assert first.version == 1
+    created = read_header(path)[1]
+    # ttl=0: every poll refetches, but identical content keeps the version and the map
+    assert store.current() is first
+    assert read_header(path)[0] == 1 and read_header(path)[1] >= created
+    data['pacing'] = PACING + [{'Curriculum': 'EL Education', 'Grade': '3', 'Module': '2'}]
+    second = store.current()
+    assert second.version == 2 and len(second.tables['pacing']) == 2
+
+
+def test_other_workers_follow_the_file(path):
+    data = {'schools': list(SCHOOLS), 'pacing': list(PACING)}
+    writer = _store(path, data)
+    reader = _store(path, {}, ttl=3600)
+    writer.current()
+    assert reader.current().version == 1
+    data['schools'] = SCHOOLS[:2]
+    writer.refresh(force=True)
+    assert reader.current().version == 2
+    assert len(reader.rows('schools')) == 2
+
+
+def test_engine_keeps_rows_across_same_content_refresh(path):
+    data = {'schools': list(SCHOOLS), 'pacing': list(PACING)}
+    store = _store(path, data)
+    engine = DataEngine({name: (lambda name=name: store.rows(name)) for name in data}, ttl=0)
+    engine.snapshot('pacing')
+    schools = engine.snapshot('schools')
+    records = schools.map_rows('upper', lambda r: r['School Name'].upper())
+    for _ in range(3):
+        again = engine.snapshot('schools')
+        assert again is schools
+        assert again.rows is store.rows('schools')
+    assert schools.map_rows('upper', lambda r: 1 / 0) is records
+
+    # A pacing edit bumps the file version; schools content is unchanged, so the
+    # engine keeps its snapshot and now holds the new file's rows
+    data['pacing'] = []
+    assert engine.snapshot('pacing').version == 2
+    again = engine.snapshot('schools')
+    assert again is schools and again.version == 1
+    assert again.rows is store.rows('schools')
+    assert engine.generation == 3
@@ -0,0 +1,126 @@
+"""Circuit breaker states, and how fetch() counts failures and probes against it."""
+import pytest
+import requests
+
+from api import _upstream
+from api._upstream import CircuitBreaker, CircuitOpen
+
+
+def _trip(b: CircuitBreaker):
+    for _ in range(b.threshold):
+        b.failure(RuntimeError('down'))
+
+
+def test_opens_after_threshold():
+    b = CircuitBreaker('h', failures=3, cooldown=60)
+    b.failure(RuntimeError('down'))
+    b.failure(RuntimeError('down'))
+    assert b.state == b.CLOSED and b.allow() == (True, False)
+    b.failure(RuntimeError('down'))
+    assert b.state == b.OPEN and b.trips == 1
+    assert b.allow() == (False, False)
+    assert b.describe()['rejected'] == 1
+
+
+def test_success_resets_the_count():
+    b = CircuitBreaker('h', failures=2, cooldown=60)
+    b.failure(RuntimeError('down'))
+    b.success()
+    b.failure(RuntimeError('down'))
+    assert b.state == b.CLOSED
+
+
+def test_single_probe_after_cooldown():
+    b = CircuitBreaker('h', failures=1, cooldown=0)
+    _trip(b)
+    assert b.allow() == (True, True)
+    assert b.state == b.HALF_OPEN
+    # Everyone else is turned away while the probe is out
+    assert b.allow() == (False, False)
+    b.success()
+    assert b.state == b.CLOSED and b.allow() == (True, False)
+
+
+def test_failed_probe_reopens():
+    b = CircuitBreaker('h', failures=5, cooldown=0)
+    _trip(b)
+    assert b.allow() == (True, True)
+    b.failure(RuntimeError('still down'))
+    assert b.state == b.OPEN and b.trips == 2
+
+
+def test_cancelled_probe_can_be_retaken():
+    b = CircuitBreaker('h', failures=1, cooldown=60)
+    _trip(b)
+    b.opened_at -= 60
+    assert b.allow() == (True, True)
+    b.cancel_probe()
+    assert b.state == b.OPEN
+    assert b.allow() == (True, True)
+
+
+class _Resp:
+    def __init__(self, status: int):
+        self.status_code = status
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code}', response=self)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Scripted requests.get: pops one status per call; returns the call log."""
+    calls = []
+    statuses = []
+
+    def get(url, headers=None, timeout=None):
+        calls.append(url)
+        return _Resp(statuses.pop(0))
+
+    monkeypatch.setattr(requests, 'get', get)
+    monkeypatch.setattr(_upstream, 'FETCH_RETRIES', 2)
+    monkeypatch.setattr(_upstream, 'backoff', lambda attempt: 0)
+    monkeypatch.setattr(_upstream, '_breakers', {})
+    return calls, statuses
+
+
+def test_fetch_counts_one_failure_per_exhausted_fetch(upstream):
+    calls, statuses = upstream
+    statuses.extend([503, 503, 503])
+    with pytest.raises(requests.HTTPError):
+        _upstream.fetch('https://sheets.test/a')
+    assert len(calls) == 3
+    assert _upstream.breaker('sheets.test').failures == 1
+
+
+def test_fetch_retries_then_succeeds(upstream):
+    calls, statuses = upstream
+    statuses.extend([500, 200])
+    assert _upstream.fetch('https://sheets.test/a').status_code == 200
+    assert len(calls) == 2
+    assert _upstream.breaker('sheets.test').failures == 0
+
+
+def test_not_found_is_not_an_outage(upstream):
+    calls, statuses = upstream
+    statuses.append(404)
+    with pytest.raises(requests.HTTPError):
+        _upstream.fetch('https://sheets.test/a')
+    assert len(calls) == 1
+    assert _upstream.breaker('sheets.test').state == CircuitBreaker.CLOSED
+
+
+def test_open_breaker_skips_the_host_and_probe_gets_one_attempt(upstream):
+    calls, statuses = upstream
+    b = _upstream.breaker('sheets.test')
+    _trip(b)
+    with pytest.raises(CircuitOpen):
+        _upstream.fetch('https://sheets.test/a')
+    assert calls == []
+    b.opened_at -= b.cooldown
+    statuses.append(503)
+    with pytest.raises(requests.HTTPError):
+        _upstream.fetch('https://sheets.test/a')
+    assert len(calls) == 1
+    assert b.state == b.OPEN
@@ -0,0 +1,343 @@
+"""
+Load-test the API against a local stand-in for Google Sheets.
+
+Starts a fake of the export / pub / gviz CSV URLs the app builds (serving the
+synthetic sheets from benchmarks/_synthetic.py, with optional latency and
+errors), starts api/index.py or server.py pointed at it through SHEETS_ORIGIN,
+then drives mixed traffic shaped like real page use:
+
+  meta           page load
+  modules        curriculum + grade picker
+  search         school + grade, no date
+  search_dated   school + grade + date
+
+and reports throughput, latency percentiles per kind, status codes, and how
+many requests reached the fake upstream.
+
+Usage:
+  python tools/loadtest.py [--target index|server] [--duration 20] [--concurrency 16]
+                           [--schools 1800] [--curricula-scale 1]
+                           [--upstream-latency-ms 300] [--upstream-jitter-ms 200]
+                           [--upstream-error-rate 0.0] [--ttl 120]
+                           [--mix meta=2,modules=2,search=3,search_dated=3]
+  python tools/loadtest.py --url http://127.0.0.1:8000 [--token $INVALIDATE_TOKEN] ...
+        drive an app you started yourself (start it with SHEETS_ORIGIN set to the
+        origin printed by --fake-only, or it will talk to the real Google); the
+        token authorizes /api/warmup, without it the first requests warm the app
+  python tools/loadtest.py --fake-only [--port 9100]
+        only run the stand-in Google server
+"""
+import argparse
+import json
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from _synthetic import make_sheets  # noqa: E402
+
+# gids and tab names the app asks for by default (see api/_shared.py)
+PACING_GIDS = {'0', '1707233296'}
+PACING_TABS = {'pacing guide'}
+
+DEFAULT_MIX = 'meta=2,modules=2,search=3,search_dated=3'
+
+
+class FakeSheets:
+    """Serves synthetic CSVs for any Google Sheets export-style URL."""
+
+    def __init__(self, schools_csv: str, pacing_csv: str, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 1):
+        self.bodies = {'schools': schools_csv.encode('utf-8'), 'pacing': pacing_csv.encode('utf-8')}
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.requests = Counter()
+        self.errors = Counter()
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = None
+
+    def sheet_for(self, query: str) -> str:
+        params = parse_qs(query)
+        gid = (params.get('gid') or [''])[0]
+        tab = (params.get('sheet') or [''])[0].strip().lower()
+        if gid in PACING_GIDS or tab in PACING_TABS:
+            return 'pacing'
+        return 'schools'
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        parts = urlsplit(handler.path)
+        if not parts.path.startswith('/spreadsheets/'):
+            handler.send_response(404)
+            handler.end_headers()
+            return
+        sheet = self.sheet_for(parts.query)
+        with self._lock:
+            self.requests[sheet] += 1
+            delay = self.latency + self._rnd.uniform(0, self.jitter)
+            fail = self._rnd.random() < self.error_rate
+        time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.errors[sheet] += 1
+            handler.send_response(503)
+            handler.end_headers()
+            return
+        body = self.bodies[sheet]
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/csv; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self, port: int = 0) -> str:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_app(target: str, origin: str, ttl: float, token: str):
+    """Run the chosen entry point in a threaded WSGI server subprocess; returns (process, base url)."""
+    port = _free_port()
+    module = 'api.index' if target == 'index' else 'server'
+    code = (
+        'from werkzeug.serving import run_simple\n'
+        f'from {module} import app\n'
+        f'run_simple("127.0.0.1", {port}, app, threaded=True)\n'
+    )
+    env = dict(os.environ, SHEETS_ORIGIN=origin, SNAPSHOT_TTL_SECONDS=str(ttl), DATA_SOURCE='sheets',
+               INVALIDATE_TOKEN=token)
+    proc = subprocess.Popen([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc, f'http://127.0.0.1:{port}'
+
+
+def wait_ready(requests, base: str, proc=None, timeout: float = 30.0):
+    """Poll /api/health (served by both entry points) until it answers 200."""
+    deadline = time.time() + timeout
+    last = 'no response'
+    while time.time() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f'app process exited with status {proc.returncode} before {base} was ready')
+        try:
+            status = requests.get(f'{base}/api/health', timeout=2).status_code
+            if status == 200:
+                return
+            last = f'HTTP {status}'
+        except requests.RequestException as e:
+            last = f'{type(e).__name__}: {e}'
+        time.sleep(0.2)
+    raise RuntimeError(f'{base}/api/health did not return 200 within {timeout}s (last: {last})')
+
+
+def parse_mix(raw: str) -> list[tuple[str, int]]:
+    mix = []
+    for part in raw.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip():
+            mix.append((name.strip(), int(weight or 1)))
+    return mix
+
+
+def make_requests(meta: dict, seed: int):
+    """(rng, build) where build(kind) -> (path, params), drawing schools and curricula from the app's own /meta."""
+    rnd = random.Random(seed)
+    schools = meta.get('schools') or []
+    curricula = meta.get('curricula') or ['EL Education']
+    grades = [g for g in (meta.get('grades') or ['3']) if g not in ('9', '10', '11', '12')]
+    start = date(2025, 9, 2)
+
+    def school_params():
+        ref = rnd.choice(schools) if schools else {'district': '', 'school': ''}
+        return {'district': ref['district'], 'school': ref['school'], 'grade': rnd.choice(grades)}
+
+    def build(kind: str):
+        if kind == 'meta':
+            return '/api/meta', {}
+        if kind == 'modules':
+            return '/api/modules', {'curriculum': rnd.choice(curricula), 'grade': rnd.choice(grades)}
+        if kind == 'search':
+            return '/api/search', school_params()
+        if kind == 'search_dated':
+            return '/api/search', dict(school_params(), date=(start + timedelta(days=rnd.randrange(290))).isoformat())
+        raise ValueError(f'unknown request kind: {kind}')
+
+    return rnd, build
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def run_load(requests, base: str, mix, duration: float, concurrency: int, seed: int) -> dict:
+    meta = requests.get(f'{base}/api/meta', timeout=60).json()
+    kinds = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    latencies = defaultdict(list)
+    statuses = Counter()
+    failures = Counter()
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def worker(i: int):
+        rnd, build = make_requests(meta, seed + i)
+        session = requests.Session()
+        local = defaultdict(list)
+        local_status = Counter()
+        local_fail = Counter()
+        while time.time() < stop_at:
+            kind = rnd.choices(kinds, weights)[0]
+            path, params = build(kind)
+            t0 = time.perf_counter()
+            try:
+                resp = session.get(base + path, params=params, timeout=60)
+                resp.content
+                local_status[resp.status_code] += 1
+                if resp.status_code >= 400:
+                    local_fail[kind] += 1
+            except requests.RequestException as e:
+                local_status[type(e).__name__] += 1
+                local_fail[kind] += 1
+            local[kind].append(time.perf_counter() - t0)
+        with lock:
+            for kind, values in local.items():
+                latencies[kind].extend(values)
+            statuses.update(local_status)
+            failures.update(local_fail)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    def summary(values: list[float], failed: int) -> dict:
+        values = sorted(values)
+        return {
+            'requests': len(values),
+            'failed': failed,
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p90_ms': round(percentile(values, 90) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round((values[-1] if values else 0.0) * 1000, 2),
+        }
+
+    everything = [v for values in latencies.values() for v in values]
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'throughput_rps': round(len(everything) / elapsed, 1) if elapsed else 0.0,
+        'overall': summary(everything, sum(failures.values())),
+        'by_kind': {kind: summary(latencies[kind], failures[kind]) for kind in kinds},
+        'status': {str(k): v for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0]))},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--target', choices=('index', 'server'), default='index')
+    ap.add_argument('--url', default='', help='drive an already running app instead of starting one')
+    ap.add_argument('--fake-only', action='store_true', help='only run the stand-in Google server')
+    ap.add_argument('--port', type=int, default=0, help='port for the stand-in Google server (default: any)')
+    ap.add_argument('--duration', type=float, default=20.0)
+    ap.add_argument('--concurrency', type=int, default=16)
+    ap.add_argument('--mix', default=DEFAULT_MIX)
+    ap.add_argument('--schools', type=int, default=1800)
+    ap.add_argument('--curricula-scale', type=int, default=1)
+    ap.add_argument('--upstream-latency-ms', type=float, default=300.0)
+    ap.add_argument('--upstream-jitter-ms', type=float, default=200.0)
+    ap.add_argument('--upstream-error-rate', type=float, default=0.0)
+    ap.add_argument('--ttl', type=float, default=120.0, help='SNAPSHOT_TTL_SECONDS for the started app')
+    ap.add_argument('--seed', type=int, default=7)
+    ap.add_argument('--token', default=os.environ.get('INVALIDATE_TOKEN', ''),
+                    help='INVALIDATE_TOKEN of the app, sent to /api/warmup')
+    args = ap.parse_args()
+
+    import requests
+
+    schools_csv, pacing_csv = make_sheets(n_schools=args.schools, curricula_scale=args.curricula_scale, seed=args.seed)
+    fake = FakeSheets(schools_csv, pacing_csv, args.upstream_latency_ms, args.upstream_jitter_ms,
+                      args.upstream_error_rate, seed=args.seed)
+    origin = fake.start(args.port)
+    if args.fake_only:
+        print(f'stand-in Google Sheets at {origin}; run the app with SHEETS_ORIGIN={origin}', flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return
+
+    proc = None
+    base = args.url.rstrip('/')
+    try:
+        token = args.token
+        if not base:
+            token = token or secrets.token_hex(16)
+            proc, base = start_app(args.target, origin, args.ttl, token)
+        wait_ready(requests, base, proc)
+        t0 = time.perf_counter()
+        warm = requests.get(f'{base}/api/warmup', headers={'Authorization': f'Bearer {token}'}, timeout=120)
+        warmup_s = time.perf_counter() - t0
+        if warm.status_code != 200:
+            # e.g. --url without --token: the first requests of the run pay for loading instead
+            print(f'warning: /api/warmup returned HTTP {warm.status_code}', file=sys.stderr)
+        upstream_after_warmup = sum(fake.requests.values())
+        report = run_load(requests, base, parse_mix(args.mix), args.duration, args.concurrency, args.seed)
+        report = {
+            'target': args.url or args.target,
+            'concurrency': args.concurrency,
+            'warmup_s': round(warmup_s, 2),
+            **report,
+            'upstream': {
+                'requests': dict(fake.requests),
+                'errors': dict(fake.errors),
+                'during_load': sum(fake.requests.values()) - upstream_after_warmup,
+            },
+        }
+        print(json.dumps(report, indent=2))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+        fake.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Report memory held by the loaded data, and how it scales with sheet size.
+
+Without --trend: loads the configured data source (or synthetic sheets with
+--synthetic), runs warmup so every index and the /meta payload exist, and prints
+the same report as /api/debug/memory: bytes per snapshot split into raw rows,
+per-row records, indexes and caches, plus the /meta and response-body caches
+and the process RSS.
+
+With --trend: repeats that in a fresh process per synthetic size and prints
+bytes/row per sheet for each size, plus a least-squares fit of total bytes
+against rows (fixed cost + marginal bytes per row) to extrapolate worker
+memory for larger sheets.
+
+Usage:
+  python tools/memory.py [--synthetic 1800] [--curricula-scale 1] [--json]
+  python tools/memory.py --trend 250,500,1000,2000,4000 [--curricula-scale 1]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+
+def report(synthetic: int, curricula_scale: int) -> dict:
+    if synthetic:
+        from _synthetic import use_synthetic
+        use_synthetic(n_schools=synthetic, curricula_scale=curricula_scale)
+    from api._shared import build_memory_report, build_meta, warmup
+    warmup()
+    build_meta()
+    return build_memory_report()
+
+
+def print_report(r: dict):
+    mib = 1024 * 1024
+    for name, snap in r['snapshots'].items():
+        print(f'{name}: {snap["rows"]} rows, {snap["total_bytes"] / mib:.2f} MiB, {snap["bytes_per_row"]} B/row')
+        for key, size in snap['detail'].items():
+            print(f'  {key:<32} {size / 1024:>10.1f} KiB')
+    for key, size in r['caches'].items():
+        print(f'{key:<34} {size / 1024:>10.1f} KiB')
+    print(f'{"total":<34} {r["total_bytes"] / mib:>10.2f} MiB')
+    rss = r['process']['rss_bytes']
+    if rss:
+        print(f'{"process rss":<34} {rss / mib:>10.2f} MiB')
+
+
+def fit(points: list[tuple[int, int]]) -> tuple[float, float]:
+    """Least-squares (intercept, slope) of bytes against rows."""
+    n = len(points)
+    mx = sum(x for x, _ in points) / n
+    my = sum(y for _, y in points) / n
+    var = sum((x - mx) ** 2 for x, _ in points)
+    slope = sum((x - mx) * (y - my) for x, y in points) / var if var else 0.0
+    return my - slope * mx, slope
+
+
+def trend(sizes: list[int], curricula_scale: int):
+    rows = []
+    for n in sizes:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--synthetic', str(n),
+             '--curricula-scale', str(curricula_scale), '--json'],
+            check=True, capture_output=True, text=True, cwd=ROOT,
+        ).stdout
+        rows.append((n, json.loads(out.strip().splitlines()[-1])))
+
+    print(f'{"schools":>8} {"rows":>7} {"schools B/row":>14} {"pacing B/row":>13} {"total MiB":>10} {"rss MiB":>9}')
+    points = []
+    for n, r in rows:
+        snaps = r['snapshots']
+        n_rows = sum(s['rows'] for s in snaps.values())
+        points.append((n_rows, r['total_bytes']))
+        rss = r['process']['rss_bytes']
+        print(f'{n:>8} {n_rows:>7} {snaps["schools"]["bytes_per_row"]:>14} {snaps["pacing"]["bytes_per_row"]:>13} '
+              f'{r["total_bytes"] / 1048576:>10.2f} {(rss or 0) / 1048576:>9.1f}')
+    if len(points) > 1:
+        intercept, slope = fit(points)
+        print(f'fit: {intercept / 1048576:.2f} MiB fixed + {slope:.0f} B per row')
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--synthetic', type=int, default=0, help='use N synthetic schools instead of the data source')
+    ap.add_argument('--curricula-scale', type=int, default=1)
+    ap.add_argument('--trend', default='', help='comma-separated synthetic school counts')
+    ap.add_argument('--json', action='store_true')
+    args = ap.parse_args()
+
+    if args.trend:
+        trend([int(n) for n in args.trend.split(',') if n.strip()], args.curricula_scale)
+        return
+    r = report(args.synthetic, args.curricula_scale)
+    if args.json:
+        print(json.dumps(r))
+    else:
+        print_report(r)
+
+
+if __name__ == '__main__':
+    main()
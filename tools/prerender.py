@@ -0,0 +1,198 @@
+"""
+Pre-render API responses into static JSON under public/ for CDN serving.
+
+Runs the same builders the API uses against the current data source and writes:
+
+  data/meta.json                                  /api/meta
+  data/school-grades.json                         /api/school-grades
+  data/modules/<curriculum>/<grade>.json          /api/modules?curriculum=&grade=
+  data/search/<district>/<school>/<grade>.json    /api/search?district=&school=&grade=
+  data/manifest.json                              snapshot versions, file hashes,
+                                                  and name -> path lookups
+
+Search shards are undated; each result also carries start_md/end_md so a client
+can apply a date with the same year-wrap rule as the API. Paths use slug + short
+hash, so read them from the manifest instead of rebuilding them.
+
+Generation is incremental (unchanged files are not rewritten, files no longer
+produced are removed) and fans out across processes. The snapshots loaded at
+the start are pinned for the whole run, so every file comes from the same data.
+
+Usage:
+  python tools/prerender.py [--out public/data] [--jobs N] [--full]
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Read by the engine at import: a long render (or a forked worker) must not see
+# a snapshot expire and refetch the sheets partway through.
+os.environ['SNAPSHOT_TTL_SECONDS'] = str(365 * 24 * 3600)
+
+from api._json import dumps  # noqa: E402
+from api._shared import (  # noqa: E402
+    ENGINE,
+    build_meta,
+    build_modules,
+    build_school_grades,
+    build_search,
+    warmup,
+)
+
+MANIFEST = 'manifest.json'
+
+
+def _slug(value: str) -> str:
+    text = re.sub(r'[^a-z0-9]+', '-', str(value or '').lower()).strip('-')[:60] or 'x'
+    digest = hashlib.sha1(str(value or '').encode('utf-8')).hexdigest()[:8]
+    return f'{text}-{digest}'
+
+
+def _encode(data) -> bytes:
+    # The API's own encoder, so files match response bodies byte for byte
+    return dumps(data)
+
+
+def _render(job: tuple):
+    kind, args = job
+    if kind == 'meta':
+        return build_meta()
+    if kind == 'school-grades':
+        return build_school_grades()
+    if kind == 'modules':
+        return build_modules(*args)
+    if kind == 'search':
+        district, school, grade = args
+        return build_search({'district': district, 'school': school, 'grade': grade, 'include_bounds': True})
+    raise ValueError(f'unknown job kind: {kind}')
+
+
+def _render_chunk(out_dir: str, chunk: list, previous: dict) -> list:
+    """Render and write one chunk of (relpath, job); returns (relpath, sha256, written)."""
+    done = []
+    for relpath, job in chunk:
+        body = _encode(_render(job))
+        digest = hashlib.sha256(body).hexdigest()
+        path = os.path.join(out_dir, relpath)
+        written = previous.get(relpath) != digest or not os.path.exists(path)
+        if written:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f'{path}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, path)
+        done.append((relpath, digest, written))
+    return done
+
+
+def _prune(out_dir: str, keep: set) -> int:
+    """Remove rendered files under out_dir that are not in keep; returns how many."""
+    removed = 0
+    for dirpath, _, filenames in os.walk(out_dir, topdown=False):
+        for name in filenames:
+            rel = os.path.relpath(os.path.join(dirpath, name), out_dir).replace(os.sep, '/')
+            if not name.endswith('.json') or rel == MANIFEST or rel in keep:
+                continue
+            try:
+                os.remove(os.path.join(dirpath, name))
+                removed += 1
+            except OSError:
+                pass
+        if dirpath != out_dir and not os.listdir(dirpath):
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+    return removed
+
+
+def plan() -> tuple[list, dict]:
+    """Every (relpath, job) to render, plus the manifest's name -> path lookups."""
+    meta = build_meta()
+    jobs = [('meta.json', ('meta', ())), ('school-grades.json', ('school-grades', ()))]
+    lookup = {'modules': {}, 'search': {}}
+
+    for curriculum in meta.get('curricula') or []:
+        c_slug = _slug(curriculum)
+        for grade in meta.get('grades') or []:
+            rel = f'modules/{c_slug}/{grade}.json'
+            jobs.append((rel, ('modules', (curriculum, grade))))
+            lookup['modules'].setdefault(curriculum, {})[grade] = rel
+
+    # Union grades per (district, school), as /api/search does across duplicate rows
+    grades_by_school: dict[tuple, set] = {}
+    for item in build_school_grades().get('items') or []:
+        grades_by_school.setdefault((item['district'], item['school']), set()).update(item.get('grades') or [])
+    for (district, school), grades in sorted(grades_by_school.items()):
+        base = f'search/{_slug(district)}/{_slug(school)}'
+        for grade in sorted(grades):
+            rel = f'{base}/{grade}.json'
+            jobs.append((rel, ('search', (district, school, grade))))
+            lookup['search'].setdefault(district, {}).setdefault(school, {})[grade] = rel
+    return jobs, lookup
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--out', default=os.path.join(ROOT, 'public', 'data'))
+    ap.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    ap.add_argument('--full', action='store_true', help='rewrite every file even if unchanged')
+    args = ap.parse_args()
+    args.jobs = max(1, args.jobs)
+
+    t0 = time.perf_counter()
+    warm = warmup()
+    if not warm['ok']:
+        print(f'warning: warmup reported errors: {warm["steps"]}', file=sys.stderr)
+
+    manifest_path = os.path.join(args.out, MANIFEST)
+    previous = {}
+    if not args.full and os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            previous = json.load(f).get('files') or {}
+
+    jobs, lookup = plan()
+    chunks = [jobs[i::args.jobs] for i in range(args.jobs)]
+    results = []
+    # Forked workers inherit the warm snapshots; without fork, render in-process
+    # rather than having every worker refetch the sheets.
+    if args.jobs > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=args.jobs, mp_context=ctx) as pool:
+            for part in pool.map(_render_chunk, [args.out] * len(chunks), chunks, [previous] * len(chunks)):
+                results.extend(part)
+    else:
+        results = _render_chunk(args.out, jobs, previous)
+
+    files = {rel: digest for rel, digest, _ in sorted(results)}
+    # Against the directory, not the old manifest: --full ignores the manifest,
+    # and files from an interrupted run may never have been listed in it.
+    removed = _prune(args.out, set(files))
+
+    manifest = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'snapshot_versions': {name: ENGINE.snapshot(name).version for name in ('schools', 'pacing')},
+        'files': files,
+        **lookup,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    with open(manifest_path + '.tmp', 'wb') as f:
+        f.write(_encode(manifest))
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    written = sum(1 for _, _, w in results if w)
+    print(f'{len(files)} files ({written} written, {len(files) - written} unchanged, {removed} removed) '
+          f'in {time.perf_counter() - t0:.2f}s with {args.jobs} job(s) -> {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Report the active module for every school and grade on a date.
+
+Same rows as /api/report/active: one per (school, grade, active module), with
+an empty module when a grade has nothing scheduled that day. Rows are written
+as they are produced, so citywide reports start printing immediately.
+
+Usage:
+  python tools/report.py [--date YYYY-MM-DD] [--district 2] [--format csv|json] [--out FILE]
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api._shared import ACTIVE_REPORT_COLUMNS, iter_active_modules  # noqa: E402
+from api._stream import batched, iter_csv, iter_json_object  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--date', type=date.fromisoformat, default=date.today(), help='default: today')
+    ap.add_argument('--district', default='', help='default: citywide')
+    ap.add_argument('--format', choices=('csv', 'json'), default='csv')
+    ap.add_argument('--out', default='-', help='default: stdout')
+    args = ap.parse_args()
+
+    rows = iter_active_modules(args.date, args.district)
+    if args.format == 'csv':
+        chunks = iter_csv(rows, ACTIVE_REPORT_COLUMNS)
+    else:
+        chunks = iter_json_object({'date': args.date.isoformat(), 'district': args.district or None}, 'rows', rows)
+
+    out = sys.stdout.buffer if args.out == '-' else open(args.out, 'wb')
+    try:
+        for chunk in batched(chunks):
+            out.write(chunk)
+        if args.format == 'json':
+            out.write(b'\n')
+        out.flush()
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()